@@ -0,0 +1 @@
+"""Synthetic-corpus benchmarks for the matcher, resume parser and JD processor."""
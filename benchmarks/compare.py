@@ -0,0 +1,65 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+
+Exits with status 1 when any stage's p95 latency or peak RSS grew by more
+than the threshold percentage.
+"""
+from typing import Dict, List
+import argparse
+import json
+import sys
+
+METRICS = ["p50_ms", "p95_ms", "p99_ms", "peak_rss_mb"]
+GATED_METRICS = ["p95_ms", "peak_rss_mb"]
+
+def load_results(path: str) -> Dict:
+    with open(path) as file:
+        report = json.load(file)
+    return {(result["stage"], result["pool_size"]): result for result in report["results"]}
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[Dict]:
+    """
+    Computes the relative change of each metric for stages present in both runs.
+
+    Args:
+        baseline (Dict): Results keyed by (stage, pool_size)
+        current (Dict): Results keyed by (stage, pool_size)
+        threshold (float): Allowed growth in percent before a gated metric counts as a regression
+
+    Returns:
+        List[Dict]: One row per stage and metric
+    """
+    rows = []
+    for key in sorted(baseline.keys() & current.keys()):
+        for metric in METRICS:
+            before, after = baseline[key][metric], current[key][metric]
+            change = (after - before) / before * 100 if before else 0.0
+            rows.append({
+                "stage": key[0],
+                "pool_size": key[1],
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change_pct": round(change, 1),
+                "regression": metric in GATED_METRICS and change > threshold
+            })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    args = parser.parse_args()
+
+    rows = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['stage']:<28} pool={row['pool_size']:<7} {row['metric']:<12} "
+              f"{row['baseline']:>12} -> {row['current']:>12} ({row['change_pct']:+.1f}%){flag}")
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+from typing import Dict, List
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+FIRST_NAMES = ['Aarav', 'Maya', 'Liam', 'Priya', 'Noah', 'Zara', 'Ethan', 'Ananya', 'Lucas', 'Sofia', 'Kabir', 'Emma']
+LAST_NAMES = ['Sharma', 'Patel', 'Smith', 'Garcia', 'Chen', 'Khan', 'Müller', 'Rossi', 'Kim', 'Nair', 'Brown', 'Singh']
+SKILLS = [
+    'python', 'java', 'javascript', 'sql', 'html', 'css', 'react', 'angular', 'node.js', 'aws', 'azure',
+    'docker', 'kubernetes', 'git', 'linux', 'machine learning', 'data analysis', 'project management',
+    'typescript', 'golang', 'postgresql', 'redis', 'kafka', 'terraform', 'django', 'flask', 'fastapi',
+    'pandas', 'tensorflow', 'pytorch', 'graphql', 'microservices', 'ci/cd', 'scrum', 'tableau', 'spark'
+]
+VERBS = ['Built', 'Designed', 'Led', 'Migrated', 'Optimized', 'Automated', 'Maintained', 'Scaled', 'Delivered']
+OBJECTS = [
+    'a payments platform', 'internal dashboards', 'the data pipeline', 'customer-facing APIs',
+    'a recommendation service', 'the CI pipeline', 'a search backend', 'reporting tools', 'mobile backends'
+]
+OUTCOMES = [
+    'cutting latency by 40%', 'serving two million users', 'reducing cloud spend', 'with a team of five',
+    'improving test coverage to 90%', 'across three regions', 'ahead of schedule', 'with zero downtime'
+]
+DEGREES = ['B.Tech in Computer Science', 'Bachelor of Science in Mathematics', 'Master of Computer Applications',
+           'MSc in Data Science', 'Bachelor of Engineering in Electronics']
+UNIVERSITIES = ['Delhi University', 'State University', 'Institute of Technology', 'City College', 'National University']
+TITLES = ['Backend Engineer', 'Data Scientist', 'Frontend Developer', 'DevOps Engineer', 'Full Stack Developer',
+          'Machine Learning Engineer', 'Data Engineer', 'Engineering Manager']
+
+def generate_resume_text(rng: random.Random, pages: int = 1) -> str:
+    """Generate a plain-text resume with roughly `pages` pages of experience."""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}{rng.randint(1, 999)}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        "",
+        "Summary",
+        f"{rng.choice(TITLES)} with {rng.randint(1, 15)} years of experience.",
+        "",
+        "Experience"
+    ]
+    for _ in range(pages * 6):
+        lines.append(f"{rng.choice(TITLES)}, Company {rng.randint(1, 500)} ({rng.randint(2005, 2020)} - {rng.randint(2021, 2025)})")
+        for _ in range(rng.randint(2, 5)):
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)}, {rng.choice(OUTCOMES)}.")
+    lines += [
+        "",
+        "Education",
+        f"{rng.choice(DEGREES)}, {rng.choice(UNIVERSITIES)}, {rng.randint(2000, 2020)}",
+        "",
+        "Skills",
+        ", ".join(rng.sample(SKILLS, rng.randint(4, 12)))
+    ]
+    return "\n".join(lines)
+
+def generate_jd_text(rng: random.Random, paragraphs: int = 3) -> str:
+    """Generate a job description with requirements, responsibilities and boilerplate."""
+    title = rng.choice(TITLES)
+    lines = [title, "", "About the role"]
+    for _ in range(paragraphs):
+        lines.append(" ".join(
+            f"You will {rng.choice(VERBS).lower()} {rng.choice(OBJECTS)} {rng.choice(OUTCOMES)}."
+            for _ in range(rng.randint(2, 4))
+        ))
+    lines += ["", "Requirements"]
+    lines += [f"- Experience with {skill}" for skill in rng.sample(SKILLS, rng.randint(3, 8))]
+    lines += ["", "Responsibilities"]
+    lines += [f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)}" for _ in range(rng.randint(3, 6))]
+    lines += ["", "Experience", f"{rng.randint(1, 10)}+ years of professional software experience.", ""]
+    lines += ["Benefits", "- Health insurance", "- Flexible hours", "",
+              "We are an equal opportunity employer and value diversity at our company."]
+    return "\n".join(lines)
+
+def generate_unstructured_jd_text(rng: random.Random) -> str:
+    """Generate a job description written as prose, without section headings."""
+    skills = rng.sample(SKILLS, rng.randint(3, 6))
+    return " ".join([
+        f"We are hiring a {rng.choice(TITLES)} to {rng.choice(VERBS).lower()} {rng.choice(OBJECTS)}.",
+        f"The ideal person knows {', '.join(skills[:-1])} and {skills[-1]} well",
+        f"and has around {rng.randint(1, 10)} years in the industry.",
+        f"Day to day you would {rng.choice(VERBS).lower()} {rng.choice(OBJECTS)} {rng.choice(OUTCOMES)}."
+    ])
+
+def generate_resume_record(rng: random.Random, candidate_id: int, pages: int = 1) -> Dict:
+    """Generate parsed resume data as stored on a Resume row, without going through files."""
+    text = generate_resume_text(rng, pages)
+    return {
+        "id": candidate_id,
+        "skills": rng.sample(SKILLS, rng.randint(3, 12)),
+        "experience": text
+    }
+
+def _pdf_string(line: str) -> str:
+    line = line.encode('latin-1', 'replace').decode('latin-1')
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def write_pdf(path: str, text: str, lines_per_page: int = 60):
+    """Write `text` as a simple multi-page PDF using the built-in Helvetica font."""
+    lines = text.split('\n')
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Object 1 is the catalog, 2 the page tree, 3 the font, then a page and a content stream per page
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        content = "BT /F1 10 Tf 12 TL 50 790 Td " + " ".join(f"({_pdf_string(line)}) Tj T*" for line in page_lines) + " ET"
+        content = content.encode('latin-1')
+        objects.append(None)
+        page_ids.append(len(objects))
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects[page_ids[-1] - 1] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (page_ids[-1] + 1)
+        )
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(page_ids)
+    )
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    with open(path, 'wb') as file:
+        file.write(output)
+
+def write_docx(path: str, text: str):
+    """Write `text` as a minimal DOCX document, one paragraph per line."""
+    paragraphs = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' for line in text.split('\n')
+    )
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ))
+        archive.writestr('_rels/.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/>'
+            '</Relationships>'
+        ))
+        archive.writestr('word/document.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{paragraphs}</w:body></w:document>'
+        ))
+
+def generate_resume_files(directory: str, count: int, seed: int = 0, pages: int = 1) -> List[str]:
+    """
+    Writes a deterministic set of resume files, alternating PDF and DOCX.
+
+    Args:
+        directory (str): Output directory
+        count (int): Number of files
+        seed (int): Random seed; the same seed always produces the same corpus
+        pages (int): Approximate length of each resume in pages
+
+    Returns:
+        List[str]: Paths of the written files
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        text = generate_resume_text(rng, pages)
+        if index % 2 == 0:
+            path = os.path.join(directory, f"resume_{index:06d}.pdf")
+            write_pdf(path, text)
+        else:
+            path = os.path.join(directory, f"resume_{index:06d}.docx")
+            write_docx(path, text)
+        paths.append(path)
+    return paths
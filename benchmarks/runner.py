@@ -0,0 +1,222 @@
+"""
+Benchmark runner for the matcher, resume parser and JD processor.
+
+    python -m benchmarks.runner --pool-sizes 1000 10000 100000 --output bench.json
+
+Every stage reports throughput, p50/p95/p99 latency and peak RSS. Results are
+written as JSON; compare two runs with `python -m benchmarks.compare`.
+"""
+from typing import Callable, Dict, List
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import numpy as np
+from benchmarks.corpus import (
+    SKILLS, generate_jd_text, generate_resume_files, generate_resume_text, generate_unstructured_jd_text
+)
+
+DEFAULT_POOL_SIZES = [1000, 10000, 100000]
+
+def _reset_peak_rss():
+    # Linux lets a process reset its own high-water mark; elsewhere the peak is cumulative
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+    except OSError:
+        pass
+
+def _peak_rss_mb() -> float:
+    try:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return 0.0
+
+def measure(stage: str, pool_size: int, inputs: List, operation: Callable) -> Dict:
+    """
+    Runs `operation` once per input and summarizes the latencies.
+
+    Args:
+        stage (str): Stage name
+        pool_size (int): Candidate pool size the stage ran against, 0 if not applicable
+        inputs (List): One argument per operation
+        operation (Callable): The code under test
+
+    Returns:
+        Dict: Throughput, latency percentiles and peak RSS for the stage
+    """
+    _reset_peak_rss()
+    latencies = []
+    started = time.perf_counter()
+    for item in inputs:
+        op_started = time.perf_counter()
+        operation(item)
+        latencies.append((time.perf_counter() - op_started) * 1000)
+    total = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies else (0.0, 0.0, 0.0)
+    result = {
+        "stage": stage,
+        "pool_size": pool_size,
+        "ops": len(latencies),
+        "total_s": round(total, 4),
+        "throughput_per_s": round(len(latencies) / total, 3) if total else 0.0,
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "peak_rss_mb": round(_peak_rss_mb(), 1)
+    }
+    print(f"{stage:<28} pool={pool_size:<7} ops={result['ops']:<6} "
+          f"p50={result['p50_ms']:.3f}ms p95={result['p95_ms']:.3f}ms p99={result['p99_ms']:.3f}ms "
+          f"rss={result['peak_rss_mb']}MB")
+    return result
+
+def build_pool(size: int, seed: int) -> List[Dict]:
+    """Generate `size` resume records shaped like Resume rows, with precomputed signatures and skill sets."""
+    from skill_taxonomy import get_taxonomy
+    from text_sketch import minhash_signature
+
+    taxonomy = get_taxonomy()
+    rng = random.Random(seed)
+    # A bounded set of experience texts keeps 100k-resume pools cheap to build
+    templates = []
+    for _ in range(min(size, 500)):
+        text = generate_resume_text(rng, pages=1)
+        templates.append((text, minhash_signature(text)))
+
+    pool = []
+    for candidate_id in range(1, size + 1):
+        experience, signature = templates[rng.randrange(len(templates))]
+        skills = rng.sample(SKILLS, rng.randint(3, 12))
+        pool.append({
+            "id": candidate_id,
+            "skills": skills,
+            "skill_set": taxonomy.skill_set(skills),
+            "experience": experience,
+            "experience_signature": signature
+        })
+    return pool
+
+def run(pool_sizes: List[int], seed: int = 0, file_sample: int = 200, pair_sample: int = 1000,
+        jd_sample: int = 50, repeats: int = 5, llm_latency_ms: float = 0.0) -> Dict:
+    """
+    Runs every benchmark stage and returns the results.
+
+    Args:
+        pool_sizes (List[int]): Candidate pool sizes for the matching stages
+        seed (int): Seed for the synthetic corpus
+        file_sample (int): Number of PDF/DOCX files to parse
+        pair_sample (int): Maximum number of per-pair match scores per pool size
+        jd_sample (int): Number of job descriptions to summarize
+        repeats (int): Number of runs of each whole-pool stage
+        llm_latency_ms (float): Simulated latency of each stub LLM call
+
+    Returns:
+        Dict: Run metadata and per-stage results
+    """
+    workdir = tempfile.mkdtemp(prefix="recruitai-bench-")
+    # Keep the benchmark away from the real LLM score cache
+    os.environ['LLM_CACHE_PATH'] = os.path.join(workdir, 'llm_cache.db')
+
+    from benchmarks import stub_llm
+    import jd_processor
+    import matcher
+    import resume_parser
+    from pipeline_metrics import path_counters
+
+    stub_llm.install(llm_latency_ms)
+    rng = random.Random(seed)
+    results = []
+
+    try:
+        paths = generate_resume_files(os.path.join(workdir, 'resumes'), file_sample, seed=seed)
+        results.append(measure("parse_resume", 0, paths, resume_parser.parse_resume))
+
+        # One in four JDs is unstructured prose, which the rule-based fast path hands to the LLM
+        jds = [generate_unstructured_jd_text(rng) if index % 4 == 3 else generate_jd_text(rng) for index in range(jd_sample)]
+        paths_before = path_counters.snapshot()
+        results.append(measure("summarize_job_description", 0, jds, jd_processor.summarize_job_description))
+        jd_paths = {
+            name: count - paths_before.get(name, 0) for name, count in path_counters.snapshot().items()
+            if name.startswith("jd_summary.")
+        }
+        results.append(measure(
+            "summarize_job_description_llm_only", 0, jds,
+            lambda jd: jd_processor.summarize_job_description(jd, fast_path=False)
+        ))
+
+        jd_data = {"skills": rng.sample(SKILLS, 6), "experience": "5+ years building Python services on AWS"}
+        full_pool = build_pool(max(pool_sizes), seed)
+        for size in sorted(pool_sizes):
+            pool = full_pool[:size]
+            sample = pool[:min(size, pair_sample)]
+            results.append(measure(
+                "extract_skills", size, [candidate["experience"] for candidate in sample], resume_parser.extract_skills
+            ))
+            results.append(measure(
+                "calculate_match_score", size, sample, lambda candidate: matcher.calculate_match_score(jd_data, candidate)
+            ))
+            results.append(measure(
+                "rank_candidates", size, [pool] * repeats, lambda candidates: matcher.rank_candidates(jd_data, candidates)
+            ))
+            results.append(measure(
+                "cascade_match_scores", size, [pool] * repeats, lambda candidates: matcher.cascade_match_scores(jd_data, candidates)
+            ))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {"meta": run_metadata(seed, pool_sizes), "results": results, "jd_summary_paths": jd_paths}
+
+def run_metadata(seed: int, pool_sizes: List[int]) -> Dict:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+        "pool_sizes": pool_sizes
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the RecruitAI hot paths")
+    parser.add_argument('--pool-sizes', type=int, nargs='+', default=DEFAULT_POOL_SIZES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--file-sample', type=int, default=200)
+    parser.add_argument('--pair-sample', type=int, default=1000)
+    parser.add_argument('--jd-sample', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0)
+    parser.add_argument('--output', default='bench_results.json')
+    args = parser.parse_args()
+
+    report = run(
+        args.pool_sizes, seed=args.seed, file_sample=args.file_sample, pair_sample=args.pair_sample,
+        jd_sample=args.jd_sample, repeats=args.repeats, llm_latency_ms=args.llm_latency_ms
+    )
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+from typing import Callable, Dict, Optional
+import hashlib
+import json
+import re
+import time
+import llm_gateway
+from llm_gateway import LLMResult
+from benchmarks.corpus import SKILLS
+
+class StubGateway:
+    """
+    Deterministic stand-in for `llm_gateway.LLMGateway`.
+
+    The same prompt always produces the same answer: a 0-100 score for plain
+    prompts, a `{"scores": [...]}` list for batched candidate prompts and a
+    `JobDescriptionSummary`-shaped object for other JSON prompts. An
+    optional fixed latency simulates model time.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def _answer(self, prompt: str, format: Optional[str]) -> str:
+        digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+        candidates = len(re.findall(r"^\s*Candidate \d+:$", prompt, re.MULTILINE))
+        if format == "json" and candidates:
+            return json.dumps({"scores": [
+                {"id": number, "score": (digest[number % len(digest)] * 7 + number) % 101}
+                for number in range(1, candidates + 1)
+            ]})
+        if format == "json":
+            lowered = prompt.lower()
+            return json.dumps({
+                "skills": [skill for skill in SKILLS if skill in lowered][:8],
+                "experience": f"{digest[0] % 10 + 1}+ years",
+                "responsibilities": ["Build and maintain services"],
+                "title": "Software Engineer"
+            })
+        return str(int.from_bytes(digest[:4], 'big') % 101)
+
+    def generate(self, prompt: str, model: str = "llama2", format: Optional[str] = None,
+                 deadline: Optional[float] = None, fallback: str = "",
+                 options: Optional[Dict] = None, stop_when: Optional[Callable[[str], bool]] = None) -> LLMResult:
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        text = self._answer(prompt, format)
+        stopped_early = False
+        if stop_when is not None:
+            # Replay the answer as a token stream in small pieces
+            for end in range(4, len(text) + 4, 4):
+                if stop_when(text[end - 4:end]):
+                    stopped_early = end < len(text)
+                    break
+        return LLMResult(
+            text=text,
+            model=model,
+            latency_ms=self.latency_ms,
+            prompt_tokens=len(prompt.split()),
+            completion_tokens=len(text.split()),
+            stopped_early=stopped_early
+        )
+
+    async def agenerate(self, prompt: str, model: str = "llama2", format: Optional[str] = None,
+                        deadline: Optional[float] = None, fallback: str = "",
+                        options: Optional[Dict] = None,
+                        stop_when: Optional[Callable[[str], bool]] = None) -> LLMResult:
+        return self.generate(prompt, model, format, deadline, fallback, options, stop_when)
+
+    def stats(self) -> Dict:
+        return {"calls": self.calls}
+
+    def close(self):
+        pass
+
+def install(latency_ms: float = 0.0) -> StubGateway:
+    """Replace the process-wide LLM gateway with a stub and return it."""
+    stub = StubGateway(latency_ms)
+    llm_gateway._gateway = stub
+    return stub
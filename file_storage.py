@@ -0,0 +1,272 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.base import NEVER_SET, NO_VALUE
+
+UPLOAD_STORAGE_PATH = os.getenv('UPLOAD_STORAGE_PATH', 'uploads')
+# Temporary upload files older than this were left by interrupted writes
+TEMP_FILE_MAX_AGE_SECONDS = float(os.getenv('TEMP_FILE_MAX_AGE_SECONDS', 3600))
+
+def storage_key(digest: str, extension: str) -> str:
+    """Return the sharded key for content with SHA-256 `digest`, e.g. "ab/cd/abcd...ef.pdf"."""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}"
+
+class FileStorage(ABC):
+    """
+    Content-addressed file storage with reference counting.
+
+    Files are keyed by the hash of their content, so storing the same bytes
+    twice keeps one copy and adds a reference. `release` drops a reference
+    and deletes the file when none are left.
+    """
+
+    # Directory for in-progress uploads; must be on the same filesystem as the files
+    temp_dir: str
+
+    @abstractmethod
+    def put_file(self, temp_path: str, digest: str, extension: str) -> str:
+        """Move a fully written temporary file into storage, add a reference and return its key."""
+
+    @abstractmethod
+    def put_bytes(self, data: bytes, digest: str, extension: str) -> str:
+        """Store `data`, add a reference and return its key."""
+
+    @abstractmethod
+    def read(self, key: str) -> bytes:
+        """Return the content stored under `key`."""
+
+    @abstractmethod
+    def path(self, key: str) -> str:
+        """Return a local filesystem path for readers such as PyPDF2 that need one."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Check whether `key` is stored."""
+
+    @abstractmethod
+    def refcount(self, key: str) -> int:
+        """Return the number of references to `key`."""
+
+    @abstractmethod
+    def release(self, key: str) -> int:
+        """Drop one reference, deleting the file at zero; returns the references left."""
+
+    def cleanup_temp(self, max_age_seconds: float = TEMP_FILE_MAX_AGE_SECONDS) -> int:
+        """Delete ".part" files in `temp_dir` older than `max_age_seconds`; returns how many were removed."""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for entry in os.scandir(self.temp_dir):
+            try:
+                if entry.name.endswith(".part") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+class LocalFileStorage(FileStorage):
+    """
+    Stores files under two levels of hash-prefix directories on local disk.
+
+    Writes land in a temporary file and are renamed into place, so readers
+    never see a partial file. Reference counts live in a SQLite table next
+    to the files.
+    """
+
+    def __init__(self, root: str = UPLOAD_STORAGE_PATH):
+        self.root = root
+        self.temp_dir = os.path.join(root, ".tmp")
+        os.makedirs(self.temp_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, ".refs.db"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS refs (key TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def _add_ref(self, key: str):
+        self._conn.execute(
+            "INSERT INTO refs (key, count) VALUES (?, 1) ON CONFLICT(key) DO UPDATE SET count = count + 1", (key,)
+        )
+
+    def put_file(self, temp_path: str, digest: str, extension: str) -> str:
+        key = storage_key(digest, extension)
+        target = self._file_path(key)
+        with self._lock:
+            if os.path.exists(target):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(temp_path, target)
+            self._add_ref(key)
+        return key
+
+    def put_bytes(self, data: bytes, digest: str, extension: str) -> str:
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.temp_dir, suffix=".part")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(data)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        return self.put_file(temp_path, digest, extension)
+
+    def read(self, key: str) -> bytes:
+        with open(self._file_path(key), "rb") as file:
+            return file.read()
+
+    def path(self, key: str) -> str:
+        return self._file_path(key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._file_path(key))
+
+    def refcount(self, key: str) -> int:
+        row = self._conn.execute("SELECT count FROM refs WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def release(self, key: str) -> int:
+        with self._lock:
+            remaining = max(self.refcount(key) - 1, 0)
+            if remaining:
+                self._conn.execute("UPDATE refs SET count = ? WHERE key = ?", (remaining, key))
+            else:
+                self._conn.execute("DELETE FROM refs WHERE key = ?", (key,))
+                try:
+                    os.remove(self._file_path(key))
+                except FileNotFoundError:
+                    pass
+        return remaining
+
+class InMemoryFileStorage(FileStorage):
+    """Keeps files in a dict; `path` writes a file to a scratch directory on demand."""
+
+    def __init__(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="recruitai-storage-")
+        self._files: Dict[str, bytes] = {}
+        self._refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def put_file(self, temp_path: str, digest: str, extension: str) -> str:
+        with open(temp_path, "rb") as file:
+            data = file.read()
+        os.remove(temp_path)
+        return self.put_bytes(data, digest, extension)
+
+    def put_bytes(self, data: bytes, digest: str, extension: str) -> str:
+        key = storage_key(digest, extension)
+        with self._lock:
+            self._files.setdefault(key, data)
+            self._refs[key] = self._refs.get(key, 0) + 1
+        return key
+
+    def read(self, key: str) -> bytes:
+        return self._files[key]
+
+    def path(self, key: str) -> str:
+        file_path = os.path.join(self.temp_dir, key.replace("/", "_"))
+        if not os.path.exists(file_path):
+            with open(file_path, "wb") as file:
+                file.write(self._files[key])
+        return file_path
+
+    def exists(self, key: str) -> bool:
+        return key in self._files
+
+    def refcount(self, key: str) -> int:
+        return self._refs.get(key, 0)
+
+    def release(self, key: str) -> int:
+        with self._lock:
+            remaining = max(self._refs.get(key, 0) - 1, 0)
+            if remaining:
+                self._refs[key] = remaining
+            else:
+                self._refs.pop(key, None)
+                self._files.pop(key, None)
+        return remaining
+
+    def close(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+_storage = None
+_storage_lock = threading.Lock()
+
+def get_storage() -> FileStorage:
+    """Return the shared upload storage, a LocalFileStorage at UPLOAD_STORAGE_PATH by default."""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = LocalFileStorage()
+        return _storage
+
+def stored_file_path(file_ref: Optional[str]) -> Optional[str]:
+    """
+    Return a local path for a row's stored file, or None if it is gone.
+
+    Rows hold a storage key; rows saved before keys were stored hold a
+    filesystem path, which is returned as is while the file exists.
+    """
+    if not file_ref:
+        return None
+    storage = get_storage()
+    if storage.exists(file_ref):
+        return storage.path(file_ref)
+    return file_ref if os.path.isfile(file_ref) else None
+
+def set_storage(storage: FileStorage):
+    """Replace the shared upload storage, e.g. with an InMemoryFileStorage in tests."""
+    global _storage
+    with _storage_lock:
+        _storage = storage
+
+# Rows hold one storage reference to their file. Deleting a row, or pointing it at
+# another file, releases the reference once the transaction commits.
+def _queue_release(session, key):
+    if key:
+        session.info.setdefault("released_storage_keys", []).append(key)
+
+def _release_deleted_row_file(mapper, connection, target):
+    _queue_release(object_session(target), target.file_path)
+
+def _release_replaced_file(target, value, oldvalue, initiator):
+    session = object_session(target)
+    if session is not None and oldvalue not in (None, NO_VALUE, NEVER_SET) and oldvalue != value:
+        _queue_release(session, oldvalue)
+
+def _release_committed(session):
+    storage = get_storage()
+    for key in session.info.pop("released_storage_keys", []):
+        try:
+            # Legacy rows hold a filesystem path rather than a key; those files are not reference counted
+            if storage.exists(key):
+                storage.release(key)
+        except Exception as e:
+            print(f"Error releasing stored file {key}: {str(e)}")
+
+def _forget_releases(session):
+    session.info.pop("released_storage_keys", None)
+
+def release_files_with_rows(*models):
+    """
+    Release a row's storage reference when the row is deleted or its file replaced.
+
+    Each model needs a `file_path` column holding a storage key. References
+    are released through the shared storage after the transaction commits,
+    and kept if it rolls back. Safe to call again for more models.
+    """
+    for model in models:
+        if not event.contains(model, "after_delete", _release_deleted_row_file):
+            event.listen(model, "after_delete", _release_deleted_row_file)
+            event.listen(model.file_path, "set", _release_replaced_file, active_history=True)
+    if not event.contains(Session, "after_commit", _release_committed):
+        event.listen(Session, "after_commit", _release_committed)
+        event.listen(Session, "after_rollback", _forget_releases)
@@ -0,0 +1,102 @@
+from typing import Iterable, Optional, Tuple
+from pathlib import Path
+import hashlib
+import os
+import tempfile
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from file_storage import get_storage
+
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 1024 * 1024))
+MAX_UPLOAD_MB = float(os.getenv('MAX_UPLOAD_MB', 10))
+
+# Leading bytes of each accepted file type; plain text is recognized by having no NUL bytes
+FILE_SIGNATURES = {
+    ".pdf": b"%PDF-",
+    ".docx": b"PK\x03\x04",
+    ".doc": b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+}
+RESUME_EXTENSIONS = (".pdf", ".docx")
+JD_EXTENSIONS = (".pdf", ".doc", ".docx", ".txt")
+
+class UploadRejected(Exception):
+    """An upload that was refused before being stored, with the HTTP status to report."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+def content_hash(data: bytes) -> str:
+    """Return the SHA-256 hex digest used to recognize identical uploads."""
+    return hashlib.sha256(data).hexdigest()
+
+def sniff_matches(extension: str, head: bytes) -> bool:
+    """Check that the first bytes of a file look like its extension says."""
+    if extension == ".txt":
+        return b"\x00" not in head
+    signature = FILE_SIGNATURES.get(extension)
+    return signature is not None and head.startswith(signature)
+
+def _open_temp(directory: str):
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    return os.fdopen(file_descriptor, "wb"), temp_path
+
+async def save_upload(upload: UploadFile, allowed_extensions: Iterable[str] = RESUME_EXTENSIONS,
+                      max_bytes: Optional[int] = None, directory: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Streams an upload to a temporary file in fixed-size chunks.
+
+    The content is hashed and size-checked as it is written, so at most one
+    chunk is held in memory. The type is checked against the first chunk
+    before anything reaches the disk. File writes run in the threadpool.
+
+    Args:
+        upload (UploadFile): The uploaded file
+        allowed_extensions (Iterable[str]): Accepted file extensions, such as ".pdf"
+        max_bytes (Optional[int]): Size limit, defaults to MAX_UPLOAD_MB
+        directory (Optional[str]): Directory for the temporary file, defaults to the storage's temp_dir
+
+    Returns:
+        Tuple[str, str]: Temporary file path and SHA-256 hex digest of the content.
+        Move the file into storage with `FileStorage.put_file` or delete it with `discard_upload`.
+
+    Raises:
+        UploadRejected: 415 for an unsupported or mislabeled type, 413 once the size limit is exceeded
+    """
+    if max_bytes is None:
+        max_bytes = int(MAX_UPLOAD_MB * 1024 * 1024)
+    extension = Path(upload.filename or "").suffix.lower()
+    if extension not in allowed_extensions:
+        raise UploadRejected(415, f"Unsupported file type '{extension or upload.filename}'. "
+                                  f"Allowed: {', '.join(allowed_extensions)}")
+
+    first_chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+    if not sniff_matches(extension, first_chunk):
+        raise UploadRejected(415, f"{upload.filename} is not a valid {extension[1:].upper()} file")
+
+    digest = hashlib.sha256()
+    size = 0
+    buffer, temp_path = await run_in_threadpool(_open_temp, directory or get_storage().temp_dir)
+    try:
+        chunk = first_chunk
+        while chunk:
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadRejected(413, f"{upload.filename} exceeds the {max_bytes / (1024 * 1024):g} MB upload limit")
+            digest.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        await run_in_threadpool(buffer.close)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(discard_upload, temp_path)
+        raise
+    return temp_path, digest.hexdigest()
+
+def discard_upload(temp_path: str):
+    """Delete a temporary upload, ignoring files that are already gone."""
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,36 @@
+from typing import Dict, List
+import asyncio
+import threading
+from parser_workers import ParserPool
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_parser_pool() -> ParserPool:
+    """Return the shared supervised parser pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ParserPool()
+        return _pool
+
+async def parse_resumes(file_paths: List[str]) -> List[Dict]:
+    """
+    Parses resume files in isolated worker processes without blocking the event loop.
+
+    Args:
+        file_paths (List[str]): Paths to PDF or DOCX resumes
+
+    Returns:
+        List[Dict]: One outcome per path, in order; see `ParserPool.parse_many`
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, get_parser_pool().parse_many, file_paths)
+
+def shutdown():
+    """Stop the parser workers."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -1,6 +1,59 @@
-from typing import Dict
-import ollama
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+from pathlib import Path
+import re
+import docx2txt
 from pydantic import BaseModel
+from llm_gateway import estimate_tokens, get_gateway
+from skill_index import normalize_skill
+from skill_extractor import get_skill_extractor
+from skill_taxonomy import get_taxonomy
+from pipeline_metrics import MatchTrace
+from resume_parser import read_pdf_text
+from stream_parsers import JSONObjectParser
+
+logger = logging.getLogger("recruitai.jd_processor")
+
+# Approximate prompt tokens of JD text per LLM call, and the most calls per JD
+JD_CHUNK_TOKENS = int(os.getenv('JD_CHUNK_TOKENS', 1024))
+JD_MAX_CHUNKS = int(os.getenv('JD_MAX_CHUNKS', 6))
+# Generation cap per call, so each chunk's latency is bounded too
+JD_SUMMARY_MAX_TOKENS = int(os.getenv('JD_SUMMARY_MAX_TOKENS', 512))
+
+# Section headings whose content never affects the summary
+BOILERPLATE_HEADINGS = {
+    "benefits", "perks", "perks and benefits", "what we offer", "compensation", "compensation and benefits",
+    "about us", "about the company", "who we are", "our values", "equal opportunity",
+    "equal employment opportunity", "eeo statement", "diversity and inclusion", "legal", "privacy notice",
+    "how to apply", "application process"
+}
+# Sentences that mark a line as legal or recruiting boilerplate wherever it appears
+BOILERPLATE_PHRASES = (
+    "equal opportunity employer", "without regard to race", "reasonable accommodation", "e-verify",
+    "privacy notice", "privacy policy", "applicants will receive consideration", "background check",
+    "we do not accept unsolicited", "recruitment agencies"
+)
+
+# Headings of the sections the rule-based extractor reads
+JD_SECTION_HEADINGS = {
+    "requirements": [
+        "requirements", "qualifications", "minimum qualifications", "preferred qualifications", "skills",
+        "required skills", "technical skills", "must have", "nice to have", "what you bring", "who you are"
+    ],
+    "responsibilities": [
+        "responsibilities", "key responsibilities", "what you will do", "what you'll do", "duties", "your role"
+    ],
+    "experience": ["experience", "required experience", "experience required"]
+}
+_SECTION_BY_HEADING = {heading: section for section, headings in JD_SECTION_HEADINGS.items() for heading in headings}
+
+# Headings that end a boilerplate section; any other short line ending in ":" does too
+CONTENT_HEADINGS = {"about the role", "the role", "role", "overview", "job description", "summary"} | set(_SECTION_BY_HEADING)
+
+# Summaries from the rule-based extractor at or above this confidence skip the LLM
+JD_FAST_PATH_MIN_CONFIDENCE = float(os.getenv('JD_FAST_PATH_MIN_CONFIDENCE', 0.8))
 
 class JobDescriptionSummary(BaseModel):
     skills: list[str]
@@ -8,56 +61,310 @@ class JobDescriptionSummary(BaseModel):
     responsibilities: list[str]
     title: str
 
-def summarize_job_description(jd_text: str) -> Dict:
+def _heading(line: str) -> str:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 40 or stripped[0] in "-*•" or stripped.endswith("."):
+        return ""
+    name = " ".join(stripped.strip(":#* ").lower().replace("&", "and").split())
+    if name in BOILERPLATE_HEADINGS or name in CONTENT_HEADINGS or stripped.endswith(":"):
+        return name
+    return ""
+
+def strip_boilerplate(jd_text: str) -> str:
     """
-    Uses Ollama to summarize a job description and return key elements.
-    
+    Removes benefits, company and legal boilerplate from a job description.
+
+    A boilerplate heading drops every line up to the next heading-like line.
+    Lines containing boilerplate phrases are dropped wherever they appear.
+    """
+    kept = []
+    skipping = False
+    for line in jd_text.splitlines():
+        heading = _heading(line)
+        if heading:
+            skipping = heading in BOILERPLATE_HEADINGS
+        if skipping:
+            continue
+        if any(phrase in line.lower() for phrase in BOILERPLATE_PHRASES):
+            continue
+        kept.append(line)
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+
+def split_into_chunks(text: str, max_tokens: int = JD_CHUNK_TOKENS) -> List[str]:
+    """
+    Packs paragraphs into chunks of at most `max_tokens` estimated tokens.
+
+    Paragraphs stay whole where they fit; longer ones are split by line and
+    then by word.
+    """
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        if estimate_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        for line in paragraph.splitlines():
+            while estimate_tokens(line) > max_tokens:
+                cut = line.rfind(" ", 0, max_tokens * 4)
+                cut = cut if cut > 0 else max_tokens * 4
+                pieces.append(line[:cut])
+                line = line[cut:].lstrip()
+            pieces.append(line)
+
+    chunks, current = [], ""
+    for piece in pieces:
+        if not piece.strip():
+            continue
+        candidate = f"{current}\n\n{piece}" if current else piece
+        if estimate_tokens(candidate) <= max_tokens:
+            current = candidate
+        else:
+            chunks.append(current)
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+_BULLET = re.compile(r"^(?:[-*•▪◦]|\d+[.)])\s*")
+_YEARS = re.compile(r"\d+\s*(?:\+|-\s*\d+)?\s*(?:years?|yrs?)\b[^.\n]*", re.IGNORECASE)
+
+def extract_structured_summary(jd_text: str) -> Tuple[Dict, float]:
+    """
+    Extracts a summary from the headed sections of a job description without an LLM.
+
+    Skills come from the requirements sections through the taxonomy skill
+    extractor. Responsibilities are the bullets under a responsibilities
+    heading, and experience is the experience section or the first "N+
+    years" phrase. The title is the first short line before any heading.
+
     Args:
-        jd_text (str): The job description text to summarize
-        
+        jd_text (str): The job description text
+
     Returns:
-        Dict: Structured summary containing skills, experience, and responsibilities
+        Tuple[Dict, float]: The summary, shaped like `summarize_job_description` output,
+        and a 0-1 confidence that it is complete
     """
-    try:
-        # Initialize Ollama client
-        client = ollama.Client()
-        
-        # Create a prompt for the LLM
-        prompt = f"""
-        Analyze the following job description and extract:
+    sections = {"requirements": [], "responsibilities": [], "experience": []}
+    title = ""
+    current = None
+    text = strip_boilerplate(jd_text)
+    for line in text.splitlines():
+        heading = _heading(line)
+        if heading:
+            current = _SECTION_BY_HEADING.get(heading, "other")
+            continue
+        stripped = _BULLET.sub("", line.strip())
+        if not stripped:
+            continue
+        if current is None and not title and len(stripped) <= 80 and not stripped.endswith("."):
+            title = stripped
+        elif current in sections:
+            sections[current].append(stripped)
+
+    taxonomy, extractor = get_taxonomy(), get_skill_extractor()
+    requirements = "\n".join(sections["requirements"])
+    # The requirements section lists skills, so ambiguous names ("spring", "rest") are trusted there
+    skills = [taxonomy.name(skill_id) for skill_id in extractor.extract(requirements, [(0, len(requirements))])]
+    skills_from_sections = bool(skills)
+    if not skills:
+        skills = [taxonomy.name(skill_id) for skill_id in extractor.extract(text)]
+
+    responsibilities = list(dict.fromkeys(sections["responsibilities"]))
+    experience = " ".join(sections["experience"])
+    if not experience:
+        match = _YEARS.search(requirements) or _YEARS.search(text)
+        experience = match.group(0).strip() if match else ""
+
+    confidence = 0.15 if title else 0.0
+    if len(skills) >= 2:
+        confidence += 0.35 if skills_from_sections else 0.15
+    confidence += 0.3 if len(responsibilities) >= 2 else 0.15 if responsibilities else 0.0
+    confidence += 0.2 if experience else 0.0
+
+    summary = {
+        "skills": skills,
+        "experience": experience,
+        "responsibilities": responsibilities,
+        "title": title
+    }
+    return summary, round(confidence, 2)
+
+def _normalize_phrase(text: str) -> str:
+    return " ".join(text.lower().split()).rstrip(".;,")
+
+def merge_summaries(summaries: List[JobDescriptionSummary]) -> Dict:
+    """
+    Merges partial summaries in chunk order.
+
+    Skills are deduplicated by canonical taxonomy name and responsibilities
+    by normalized text, keeping the first spelling seen. The title is the
+    first non-empty one. Distinct experience statements are joined.
+    """
+    skills, responsibilities, experiences = {}, {}, {}
+    title = ""
+    for summary in summaries:
+        for skill in summary.skills:
+            if skill and skill.strip():
+                skills.setdefault(normalize_skill(skill), skill.strip())
+        for responsibility in summary.responsibilities:
+            if responsibility and responsibility.strip():
+                responsibilities.setdefault(_normalize_phrase(responsibility), responsibility.strip())
+        if summary.experience and summary.experience.strip():
+            experiences.setdefault(_normalize_phrase(summary.experience), summary.experience.strip())
+        title = title or summary.title.strip()
+    return {
+        "skills": list(skills.values()),
+        "experience": "; ".join(experiences.values()),
+        "responsibilities": list(responsibilities.values()),
+        "title": title
+    }
+
+def _summary_prompt(jd_text: str, part: int, parts: int) -> str:
+    scope = f"part {part} of {parts} of a job description" if parts > 1 else "a job description"
+    return f"""
+        Analyze the following {scope} and extract:
         1. Required skills (as a list)
         2. Required experience
         3. Key responsibilities (as a list)
         4. Job title
-        
+
+        Use an empty string or list for anything this text does not mention.
         Format the response as JSON with these keys: skills, experience, responsibilities, title
-        
+
         Job Description:
         {jd_text}
         """
-        
-        # Get response from Ollama
-        response = client.generate(
-            model="llama2",
-            prompt=prompt,
-            format="json"
-        )
-        
-        # Parse the response into a structured format
-        summary = JobDescriptionSummary.parse_raw(response.text)
-        
-        return {
-            "skills": summary.skills,
-            "experience": summary.experience,
-            "responsibilities": summary.responsibilities,
-            "title": summary.title
-        }
-        
+
+async def _summarize_chunk(chunk: str, part: int, parts: int) -> Optional[JobDescriptionSummary]:
+    # Stream the answer and stop once the JSON object has closed
+    parser = JSONObjectParser()
+    response = await get_gateway().agenerate(
+        _summary_prompt(chunk, part, parts), model="llama2", format="json",
+        options={"num_predict": JD_SUMMARY_MAX_TOKENS}, stop_when=parser.feed
+    )
+    if response.fallback:
+        print(f"Error summarizing job description part {part}: {response.error}")
+        return None
+    if parser.invalid:
+        print(f"Error parsing job description part {part}: response is not a JSON object")
+        return None
+    try:
+        return JobDescriptionSummary.parse_raw(parser.value)
+    except Exception as e:
+        print(f"Error parsing job description part {part}: {str(e)}")
+        return None
+
+async def _summarize_with_llm(jd_text: str, trace: MatchTrace) -> Dict:
+    """
+    Summarizes a job description with one concurrent LLM call per chunk.
+
+    Boilerplate is stripped first and the rest is split into chunks of
+    JD_CHUNK_TOKENS. Only the first JD_MAX_CHUNKS chunks are summarized, so
+    latency does not grow with JD length; dropped chunks are logged, counted
+    in the trace and reported in the summary under "truncated" as
+    {"parts": <chunks>, "summarized": JD_MAX_CHUNKS}. Partial summaries are
+    merged with `merge_summaries`; failed chunks are left out.
+
+    Raises:
+        RuntimeError: If no chunk could be summarized
+    """
+    chunks = split_into_chunks(strip_boilerplate(jd_text) or jd_text)
+    trace.record("chunks", len(chunks))
+    truncated = None
+    if len(chunks) > JD_MAX_CHUNKS:
+        logger.warning("Job description truncated: summarizing the first %d of %d parts", JD_MAX_CHUNKS, len(chunks))
+        trace.record("chunks_dropped", len(chunks) - JD_MAX_CHUNKS)
+        truncated = {"parts": len(chunks), "summarized": JD_MAX_CHUNKS}
+        chunks = chunks[:JD_MAX_CHUNKS]
+    summaries = await asyncio.gather(*(
+        _summarize_chunk(chunk, part, len(chunks)) for part, chunk in enumerate(chunks, start=1)
+    ))
+    summaries = [summary for summary in summaries if summary is not None]
+    if not summaries:
+        raise RuntimeError("No part of the job description could be summarized")
+    summary = merge_summaries(summaries)
+    if truncated:
+        summary["truncated"] = truncated
+    return summary
+
+async def asummarize_job_description(jd_text: str, fast_path: bool = True, raise_errors: bool = False) -> Dict:
+    """
+    Uses Ollama to summarize a job description and return key elements.
+
+    Structured JDs are summarized by `extract_structured_summary` instead
+    when its confidence reaches JD_FAST_PATH_MIN_CONFIDENCE. The path taken
+    is counted in the "jd_summary" pipeline metrics. Await this from async
+    code; `summarize_job_description` is the synchronous entry point.
+
+    Args:
+        jd_text (str): The job description text to summarize
+        fast_path (bool): Try the rule-based extractor before the LLM
+        raise_errors (bool): Raise on failure instead of returning an empty summary,
+            e.g. in task workers that retry
+
+    Returns:
+        Dict: Structured summary containing skills, experience, and responsibilities;
+        "truncated" is added when only the start of a long JD was summarized
+    """
+    trace = MatchTrace(pipeline="jd_summary")
+    try:
+        if fast_path:
+            with trace.stage("rules"):
+                summary, confidence = extract_structured_summary(jd_text)
+            trace.record("confidence", confidence)
+            if confidence >= JD_FAST_PATH_MIN_CONFIDENCE:
+                trace.record("path", "rules")
+                return summary
+
+        # Chunks are summarized concurrently through the shared gateway
+        with trace.stage("llm"):
+            summary = await _summarize_with_llm(jd_text, trace)
+        trace.record("path", "llm")
+        return summary
+
     except Exception as e:
         print(f"Error in job description summarization: {str(e)}")
+        trace.record("path", "failed")
+        if raise_errors:
+            raise
         return {
             "skills": [],
             "experience": "",
             "responsibilities": [],
             "title": ""
-        } 
\ No newline at end of file
+        }
+    finally:
+        trace.finish()
+
+def summarize_job_description(jd_text: str, fast_path: bool = True, raise_errors: bool = False) -> Dict:
+    """
+    Summarizes a job description from synchronous code; see `asummarize_job_description`.
+
+    Args:
+        jd_text (str): The job description text to summarize
+        fast_path (bool): Try the rule-based extractor before the LLM
+        raise_errors (bool): Raise on failure instead of returning an empty summary
+
+    Returns:
+        Dict: Structured summary containing skills, experience, and responsibilities
+
+    Raises:
+        RuntimeError: If called from a running event loop; await
+            `asummarize_job_description` there instead
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(asummarize_job_description(jd_text, fast_path, raise_errors))
+    raise RuntimeError(
+        "summarize_job_description cannot run inside an event loop; await asummarize_job_description instead"
+    )
+
+def read_job_description(file_path: str) -> str:
+    """Extract the text of a stored job description: PDF, DOCX or plain text, raising on unreadable files."""
+    extension = Path(file_path).suffix.lower()
+    if extension == ".pdf":
+        return read_pdf_text(file_path)
+    if extension in (".docx", ".doc"):
+        return docx2txt.process(file_path)
+    with open(file_path, encoding="utf-8", errors="replace") as file:
+        return file.read()
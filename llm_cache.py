@@ -0,0 +1,136 @@
+from typing import Dict, Optional
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry."""
+    return " ".join(text.split())
+
+def make_cache_key(model: str, prompt_version: str, jd_text: str, resume_text: str) -> str:
+    """Build a content-addressed key for an LLM qualification score."""
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, normalize_text(jd_text), normalize_text(resume_text)):
+        encoded = part.encode('utf-8')
+        # Length-prefix each part so boundaries can't collide
+        digest.update(len(encoded).to_bytes(8, 'big'))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+class LLMScoreCache:
+    """
+    Persistent SQLite cache for LLM scores with LRU eviction and TTL.
+
+    Entries older than `ttl_seconds` are treated as misses and removed. Once
+    the table grows past `max_entries`, the least recently read entries are
+    evicted.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        self.path = path or os.getenv('LLM_CACHE_PATH', 'llm_cache.db')
+        if max_entries is None:
+            max_entries = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 50000))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv('LLM_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_scores ("
+            "key TEXT PRIMARY KEY, value REAL NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_scores_accessed_at ON llm_scores (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[float]:
+        """Return the cached value for `key`, or None on a miss. Database errors count as misses."""
+        try:
+            return self._get(key)
+        except sqlite3.Error as e:
+            print(f"Error reading LLM score cache: {str(e)}")
+            with self._lock:
+                self.errors += 1
+                self.misses += 1
+            return None
+
+    def _get(self, key: str) -> Optional[float]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_scores WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_scores WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_scores SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: float):
+        """Store a value and evict the least recently used entries if over capacity; errors skip the write."""
+        try:
+            self._set(key, value)
+        except sqlite3.Error as e:
+            print(f"Error writing LLM score cache: {str(e)}")
+            with self._lock:
+                self.errors += 1
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+
+    def _set(self, key: str, value: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_scores (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_scores").fetchone()[0]
+            if count > self.max_entries:
+                overflow = count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM llm_scores WHERE key IN "
+                    "(SELECT key FROM llm_scores ORDER BY accessed_at, rowid LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM llm_scores").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": size
+        }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_score_cache() -> LLMScoreCache:
+    """Return the process-wide score cache, opening it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMScoreCache()
+        return _cache
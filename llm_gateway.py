@@ -0,0 +1,272 @@
+from typing import Callable, Dict, Optional
+import json
+import asyncio
+import os
+import threading
+import time
+import httpx
+from pydantic import BaseModel
+
+def estimate_tokens(text: str) -> int:
+    """Rough llama-family token count: about four characters per token."""
+    return (len(text) + 3) // 4
+
+class LLMResult(BaseModel):
+    text: str
+    model: str
+    fallback: bool = False
+    error: Optional[str] = None
+    latency_ms: float = 0.0
+    # Counts reported by Ollama. A stream stopped before Ollama's final stats line has no
+    # prompt count, and its completion count is the number of streamed chunks, one per token
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    stopped_early: bool = False
+
+class CircuitBreaker:
+    """
+    Stops calling the model server after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail fast for `reset_timeout` seconds. The first call after that is let
+    through as a probe: success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release_probe(self):
+        """Let another call probe if the current probe never reached the server."""
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+class LLMGateway:
+    """
+    Shared entry point for every Ollama generation.
+
+    The gateway owns one event loop on a background thread and one pooled
+    `httpx.AsyncClient`, so connections are reused across calls from both
+    sync code (`generate`) and async handlers (`agenerate`). At most
+    `max_concurrency` generations are in flight; further calls wait in a
+    queue of at most `max_queue`. Every call has a deadline, and errors,
+    timeouts, a full queue or an open circuit return a fallback result
+    instead of raising. Pass `transport` to talk to an in-process fake
+    server instead of Ollama, e.g. in tests.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 max_queue: Optional[int] = None, deadline: Optional[float] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url or os.getenv('OLLAMA_HOST', 'http://localhost:11434')
+        self.transport = transport
+        self.max_concurrency = max_concurrency or int(os.getenv('LLM_MAX_CONCURRENCY', 2))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv('LLM_MAX_QUEUE', 100))
+        self.deadline = deadline or float(os.getenv('LLM_DEADLINE_SECONDS', 60))
+        self.breaker = breaker or CircuitBreaker()
+        self.in_flight = 0
+        self.queued = 0
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="llm-gateway", daemon=True)
+                thread.start()
+                asyncio.run_coroutine_threadsafe(self._setup(), loop).result()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    async def _setup(self):
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url, limits=limits, timeout=None, transport=self.transport
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _post_generate(self, payload: Dict) -> Dict:
+        response = await self._client.post("/api/generate", json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    async def _stream_generate(self, payload: Dict, stop_when: Callable[[str], bool]) -> Dict:
+        # Closing the response mid-stream drops the connection, which makes Ollama stop generating.
+        # Token counts only arrive on the final line; Ollama streams one line per token.
+        text, chunks = [], 0
+        async with self._client.stream("POST", "/api/generate", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                body = json.loads(line)
+                piece = body.get("response", "")
+                text.append(piece)
+                chunks += 1
+                if body.get("done"):
+                    return {**body, "response": "".join(text)}
+                if piece and stop_when(piece):
+                    return {"response": "".join(text), "eval_count": chunks, "stopped_early": True}
+        return {"response": "".join(text), "eval_count": chunks}
+
+    async def _generate(self, payload: Dict, deadline: float, fallback: str,
+                        stop_when: Optional[Callable[[str], bool]] = None) -> LLMResult:
+        model = payload["model"]
+        started = time.monotonic()
+
+        if self.queued >= self.max_queue:
+            return LLMResult(text=fallback, model=model, fallback=True, error="queue full")
+        if not self.breaker.allow():
+            return LLMResult(text=fallback, model=model, fallback=True, error="circuit open")
+
+        sent = False
+
+        async def run() -> Dict:
+            nonlocal sent
+            self.queued += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.queued -= 1
+            self.in_flight += 1
+            sent = True
+            try:
+                if stop_when is not None:
+                    return await self._stream_generate(payload, stop_when)
+                return await self._post_generate(payload)
+            finally:
+                self.in_flight -= 1
+                self._semaphore.release()
+
+        try:
+            body = await asyncio.wait_for(run(), timeout=deadline)
+        except Exception as e:
+            # Running out of time while still queued says nothing about server health
+            if sent:
+                self.breaker.record_failure()
+            else:
+                self.breaker.release_probe()
+            error = "deadline exceeded" if isinstance(e, asyncio.TimeoutError) else str(e)
+            print(f"Error in LLM generation: {error}")
+            return LLMResult(
+                text=fallback,
+                model=model,
+                fallback=True,
+                error=error,
+                latency_ms=(time.monotonic() - started) * 1000
+            )
+
+        self.breaker.record_success()
+        return LLMResult(
+            text=body.get("response", ""),
+            model=model,
+            latency_ms=(time.monotonic() - started) * 1000,
+            prompt_tokens=body.get("prompt_eval_count"),
+            completion_tokens=body.get("eval_count"),
+            stopped_early=body.get("stopped_early", False)
+        )
+
+    def _submit(self, prompt: str, model: str, format: Optional[str], deadline: Optional[float],
+                fallback: str, options: Optional[Dict], stop_when: Optional[Callable[[str], bool]] = None):
+        payload = {"model": model, "prompt": prompt, "stream": stop_when is not None}
+        if format:
+            payload["format"] = format
+        if options:
+            payload["options"] = options
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(
+            self._generate(payload, deadline or self.deadline, fallback, stop_when), loop
+        )
+
+    def generate(self, prompt: str, model: str = "llama2", format: Optional[str] = None,
+                 deadline: Optional[float] = None, fallback: str = "",
+                 options: Optional[Dict] = None, stop_when: Optional[Callable[[str], bool]] = None) -> LLMResult:
+        """
+        Runs a generation from synchronous code.
+
+        Args:
+            prompt (str): Prompt text
+            model (str): Ollama model name
+            format (Optional[str]): Response format, e.g. "json"
+            deadline (Optional[float]): Seconds to wait, including queueing, before falling back
+            fallback (str): Text returned when the call cannot complete
+            options (Optional[Dict]): Ollama model options
+            stop_when (Optional[Callable[[str], bool]]): Streams the generation and is called with each
+                new chunk; returning True cancels the rest, e.g. `JSONObjectParser().feed`
+
+        Returns:
+            LLMResult: Generated text and call metadata
+        """
+        return self._submit(prompt, model, format, deadline, fallback, options, stop_when).result()
+
+    async def agenerate(self, prompt: str, model: str = "llama2", format: Optional[str] = None,
+                        deadline: Optional[float] = None, fallback: str = "",
+                        options: Optional[Dict] = None,
+                        stop_when: Optional[Callable[[str], bool]] = None) -> LLMResult:
+        """Runs a generation without blocking the caller's event loop; see `generate`."""
+        return await asyncio.wrap_future(self._submit(prompt, model, format, deadline, fallback, options, stop_when))
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "circuit": self.breaker.state
+        }
+
+    def close(self):
+        """Close the HTTP client and stop the gateway loop."""
+        with self._lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = self._client = self._semaphore = None
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_gateway() -> LLMGateway:
+    """Return the process-wide LLM gateway."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
@@ -1,22 +1,44 @@
-from fastapi import FastAPI, UploadFile, File, Form, Depends, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, UploadFile, File, Form, Depends, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
-from services.job_description_processor import JobDescriptionProcessor
-from services.resume_parser import ResumeParser
-from services.candidate_matcher import CandidateMatcher
+from fastapi.concurrency import run_in_threadpool
 from services.interview_scheduler import InterviewScheduler
-from database.models import JobDescription, Resume, ShortlistedCandidate, InterviewSchedule
+from database.models import JobDescription, JobTask, Resume, ShortlistedCandidate, InterviewSchedule, SkillPosting, MatchResult, WeightProfile
 from database.database import SessionLocal, engine
-from sqlalchemy.orm import Session
+from matcher import (
+    EXPERIENCE_WEIGHT, QUALIFICATION_WEIGHT, SHORTLIST_THRESHOLD, SKILL_WEIGHT,
+    calculate_component_scores, cascade_match_scores, combine_scores, rank_candidates
+)
+from skill_index import normalize_skills, skill_index
+from skill_taxonomy import get_taxonomy
+from ingest import parse_resumes, shutdown as shutdown_parser_pool
+from llm_cache import get_score_cache
+from llm_gateway import get_gateway
+from pipeline_metrics import MatchTrace, path_counters, stage_histograms
+from file_uploads import (
+    JD_EXTENSIONS, RESUME_EXTENSIONS, UploadRejected, content_hash, discard_upload, save_upload
+)
+from file_storage import get_storage, release_files_with_rows, stored_file_path
+from jd_processor import read_job_description, summarize_job_description
+from text_store import get_text_store
+from resume_parser import PARSER_VERSION, TEXT_EXTRACTION_VERSION
+from resume_backfill import ResumeBackfill
+from schema_migrations import add_missing_columns, create_missing_indexes
+from task_queue import TaskQueue, TaskWorkerPool
+from sqlalchemy.orm import Session, object_session
 import os
 from dotenv import load_dotenv
 from datetime import datetime
+from pathlib import Path
 import json
-from typing import List, Optional
-from pydantic import BaseModel
+import asyncio
+import time
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
 from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 import shutil
 import smtplib
 from email.mime.text import MIMEText
@@ -27,9 +49,21 @@ load_dotenv()
 
 # Create database tables
 JobDescription.metadata.create_all(bind=engine)
+JobTask.metadata.create_all(bind=engine)
 Resume.metadata.create_all(bind=engine)
 ShortlistedCandidate.metadata.create_all(bind=engine)
 InterviewSchedule.metadata.create_all(bind=engine)
+SkillPosting.metadata.create_all(bind=engine)
+MatchResult.metadata.create_all(bind=engine)
+WeightProfile.metadata.create_all(bind=engine)
+
+# Bring tables created by older versions up to date; the unique content hash index on
+# resumes waits for the backfill, which fills in hashes for older rows
+MIGRATED_TABLES = JobDescription.metadata.sorted_tables
+for column in add_missing_columns(engine, MIGRATED_TABLES):
+    print(f"Added column {column}")
+create_missing_indexes(engine, MIGRATED_TABLES)
+create_missing_indexes(engine, [table for table in MIGRATED_TABLES if table is not Resume.__table__], unique=True)
 
 app = FastAPI(title="RecruitAI API", description="AI-powered recruitment automation system")
 
@@ -50,8 +84,27 @@ def get_db():
     finally:
         db.close()
 
-# Create uploads directory if it doesn't exist
-os.makedirs("uploads", exist_ok=True)
+# Create the upload storage directories if they don't exist
+get_storage()
+
+@app.on_event("startup")
+def clean_upload_temp_files():
+    removed = get_storage().cleanup_temp()
+    if removed:
+        print(f"Removed {removed} temporary upload file(s) left by interrupted writes")
+
+# Deleting a row, or pointing it at another file, releases its stored file reference
+release_files_with_rows(Resume, JobDescription)
+
+def create_resume_unique_indexes():
+    create_missing_indexes(engine, [Resume.__table__], unique=True)
+
+resume_backfill = ResumeBackfill(SessionLocal, on_complete=create_resume_unique_indexes)
+
+# Job descriptions are summarized by in-process workers from a task table in the app database
+JD_EVENTS_POLL_SECONDS = float(os.getenv('JD_EVENTS_POLL_SECONDS', 1))
+JD_EVENTS_TIMEOUT_SECONDS = float(os.getenv('JD_EVENTS_TIMEOUT_SECONDS', 300))
+jd_task_queue = TaskQueue(SessionLocal)
 
 # API Models
 class JobDescriptionInput(BaseModel):
@@ -77,6 +130,29 @@ class ResumeResponse(BaseModel):
 class MatchRequest(BaseModel):
     job_id: int
     candidate_id: int
+    explain: bool = False
+
+class BatchMatchRequest(BaseModel):
+    job_id: int
+    candidate_ids: Optional[List[int]] = None
+    top_k: int = Field(10, ge=1)
+    mode: Literal["skills", "cascade"] = "skills"  # "skills" ranks by skill overlap, "cascade" runs the full staged score
+    llm_top_n: int = Field(20, ge=0)
+
+class WeightProfileRequest(BaseModel):
+    name: str
+    skill_weight: float = Field(ge=0, le=1)
+    experience_weight: float = Field(ge=0, le=1)
+    qualification_weight: float = Field(ge=0, le=1)
+    shortlist_threshold: float = Field(SHORTLIST_THRESHOLD, ge=0, le=100)
+
+    @model_validator(mode="after")
+    def check_weights_sum_to_one(self):
+        # Scores are weighted averages of 0-100 components, so the weights must sum to 1
+        total = self.skill_weight + self.experience_weight + self.qualification_weight
+        if abs(total - 1) > 1e-6:
+            raise ValueError(f"Weights must sum to 1, got {total:g}")
+        return self
 
 class MatchResponse(BaseModel):
     job_id: int
@@ -97,6 +173,79 @@ class InterviewResponse(BaseModel):
     scheduled_time: datetime
     sent_email: bool
 
+@app.on_event("startup")
+def load_skill_index():
+    db = SessionLocal()
+    try:
+        skill_index.load(db.query(SkillPosting.skill, SkillPosting.candidate_id).yield_per(10000))
+
+        # Backfill postings for resumes uploaded before the index existed. Resumes are
+        # marked once indexed, so ones without skills are not revisited at every startup.
+        unmarked = db.query(Resume).filter(Resume.skills_indexed.isnot(True))
+        with_postings = set(
+            candidate_id for candidate_id, in db.query(SkillPosting.candidate_id).filter(
+                SkillPosting.candidate_id.in_(unmarked.with_entities(Resume.id))
+            ).distinct()
+        )
+        for resume in unmarked.all():
+            if resume.id not in with_postings:
+                for skill in skill_index.add(resume.id, split_skills(resume.skills)):
+                    db.add(SkillPosting(skill=skill, candidate_id=resume.id))
+            resume.skill_set = pack_skills(split_skills(resume.skills))
+            resume.skills_indexed = True
+        db.commit()
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def ensure_default_weight_profile():
+    db = SessionLocal()
+    try:
+        if not db.query(WeightProfile).filter(WeightProfile.name == "default").first():
+            db.add(WeightProfile(
+                name="default",
+                version=1,
+                skill_weight=SKILL_WEIGHT,
+                experience_weight=EXPERIENCE_WEIGHT,
+                qualification_weight=QUALIFICATION_WEIGHT,
+                shortlist_threshold=SHORTLIST_THRESHOLD
+            ))
+            db.commit()
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def close_llm_gateway():
+    get_gateway().close()
+
+@app.on_event("startup")
+def start_resume_backfill():
+    # Re-derive fields of resumes parsed by an older parser version
+    if os.getenv('RESUME_BACKFILL_ON_STARTUP', '1') == '1':
+        resume_backfill.start()
+    else:
+        create_resume_unique_indexes()
+
+@app.on_event("shutdown")
+def stop_resume_backfill():
+    resume_backfill.stop(timeout=30)
+
+@app.on_event("startup")
+def start_jd_workers():
+    legacy = jd_task_queue.mark_legacy_jobs()
+    if legacy:
+        print(f"Marked {legacy} job description(s) summarized before background processing as legacy")
+    # Also re-queues JDs that were mid-summary when the server last stopped
+    jd_workers.start()
+
+@app.on_event("shutdown")
+def stop_jd_workers():
+    jd_workers.stop()
+
+@app.on_event("shutdown")
+def stop_parser_pool():
+    shutdown_parser_pool()
+
 @app.get("/")
 async def read_root():
     return {"message": "RecruitAI API - AI-powered recruitment automation system"}
@@ -117,92 +266,240 @@ async def upload_jd(
 
         # Handle text input
         if jd_text:
-            # Save text to temp file
-            temp_file_path = f"uploads/jd_text_{datetime.now().strftime('%Y%m%d%H%M%S')}.txt"
-            with open(temp_file_path, "w") as f:
-                f.write(jd_text)
-            file_path = temp_file_path
+            jd_bytes = jd_text.encode("utf-8")
+            jd_hash = content_hash(jd_bytes)
+            temp_path = None
         else:
             # Handle file upload
-            file_path = f"uploads/{jd_file.filename}"
-            with open(file_path, "wb") as buffer:
-                content = await jd_file.read()
-                buffer.write(content)
+            temp_path, jd_hash = await save_upload(jd_file, JD_EXTENSIONS)
 
-        # Process the job description
-        processor = JobDescriptionProcessor()
-        summary = processor.process(file_path)
+        # An identical job description was already summarized; reuse it
+        job = db.query(JobDescription).filter(JobDescription.content_hash == jd_hash).first()
+        if job:
+            if temp_path:
+                await run_in_threadpool(discard_upload, temp_path)
+            return duplicate_jd_response(job)
 
-        # Save to database
+        storage = get_storage()
+        if jd_text:
+            # Store the text like an uploaded .txt file
+            key = await run_in_threadpool(storage.put_bytes, jd_bytes, jd_hash, ".txt")
+        else:
+            key = await run_in_threadpool(storage.put_file, temp_path, jd_hash, Path(jd_file.filename).suffix)
+
+        # Save to database now and summarize in the background; the LLM call can take tens of seconds
         job = JobDescription(
-            title=summary.get("title", "Untitled"),
-            description=summary.get("description", ""),
-            requirements=summary.get("requirements", ""),
-            file_path=file_path
+            title="Untitled",
+            description="",
+            requirements="",
+            file_path=key,
+            content_hash=jd_hash
         )
         db.add(job)
-        db.commit()
+        # The task commits with the job, so a saved job always has its task
+        jd_task_queue.enqueue(db, "summarize_jd", job, {"storage_key": key})
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent upload of the same JD was saved first
+            db.rollback()
+            await run_in_threadpool(storage.release, key)
+            return duplicate_jd_response(
+                db.query(JobDescription).filter(JobDescription.content_hash == jd_hash).first()
+            )
         db.refresh(job)
+        jd_task_queue.notify()
 
-        return {
-            "status": "success", 
-            "message": "Job description processed successfully",
-            "job_id": job.id,
-            "title": job.title,
-            "description": job.description,
-            "requirements": job.requirements
-        }
+        return JSONResponse(
+            status_code=202,
+            content={
+                "status": "success",
+                "message": "Job description queued for processing",
+                "duplicate": False,
+                "job_id": job.id,
+                "processing_status": "queued",
+                "status_url": f"/api/jobs/{job.id}/status",
+                "events_url": f"/api/jobs/{job.id}/events"
+            }
+        )
+    except UploadRejected as e:
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"status": "error", "detail": e.detail}
+        )
     except Exception as e:
         return JSONResponse(
             status_code=500,
             content={"status": "error", "detail": str(e)}
         )
 
+@app.get("/api/jobs/{job_id}/status")
+async def get_job_status(job_id: int, db: Session = Depends(get_db)):
+    job = db.query(JobDescription).filter(JobDescription.id == job_id).first()
+    if not job:
+        return JSONResponse(
+            status_code=404,
+            content={"status": "error", "detail": "Job description not found"}
+        )
+    return {"status": "success", **await run_in_threadpool(jd_processing_status, job)}
+
+# Server-sent events: one "status" event per change, ending once processing has finished or failed
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_status(job_id: int):
+    async def events():
+        last_state = None
+        deadline = time.monotonic() + JD_EVENTS_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            status = await run_in_threadpool(load_jd_processing_status, job_id)
+            if status is None:
+                yield f"event: error\ndata: {json.dumps({'detail': 'Job description not found'})}\n\n"
+                return
+            if status["processing_status"] != last_state:
+                last_state = status["processing_status"]
+                yield f"event: status\ndata: {json.dumps(status, default=str)}\n\n"
+                if last_state in ("done", "failed", "legacy", "missing"):
+                    return
+            else:
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(JD_EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/api/upload-resume")
 async def upload_resume(
     resume_files: List[UploadFile] = File(...),
     db: Session = Depends(get_db)
 ):
+    # Storage references taken by this request that no committed row holds yet
+    uncommitted_keys = []
     try:
-        results = []
+        # Stream the uploaded files to disk, hashing them as they are written;
+        # oversize or wrong-type files are rejected individually
+        uploads, rejected = [], []
         for resume_file in resume_files:
-            # Save the uploaded file
-            file_path = f"uploads/{resume_file.filename}"
-            with open(file_path, "wb") as buffer:
-                content = await resume_file.read()
-                buffer.write(content)
-
-            # Parse the resume
-            parser = ResumeParser()
-            resume_data = parser.parse(file_path)
-
-            # Save to database
-            resume = Resume(
-                name=resume_data.get("name", "Unknown"),
-                email=resume_data.get("email", ""),
-                phone=resume_data.get("phone", ""),
-                skills=", ".join(resume_data.get("skills", [])),
-                experience=resume_data.get("experience", ""),
-                education=resume_data.get("education", ""),
-                file_path=file_path
-            )
-            db.add(resume)
-            db.commit()
-            db.refresh(resume)
-            
-            # Add to results
-            results.append({
-                "id": resume.id,
-                "name": resume.name,
-                "email": resume.email,
-                "phone": resume.phone,
-                "skills": resume.skills,
-                "experience": resume.experience,
-                "education": resume.education
-            })
+            try:
+                temp_path, resume_hash = await save_upload(resume_file, RESUME_EXTENSIONS)
+            except UploadRejected as e:
+                rejected.append({
+                    "file_name": resume_file.filename, "status": "rejected", "status_code": e.status_code, "detail": e.detail
+                })
+                continue
+            uploads.append((resume_file.filename, temp_path, resume_hash))
+
+        # Files already parsed, in this request or an earlier one, are not parsed again
+        hashes = set(resume_hash for _, _, resume_hash in uploads)
+        existing = {
+            resume.content_hash: resume
+            for resume in db.query(Resume).filter(Resume.content_hash.in_(hashes)).all()
+        }
+        storage = get_storage()
+        # Keyed by content hash: one stored file and one parse per distinct upload
+        duplicates, repeated, pending = [], [], {}
+        for file_name, temp_path, resume_hash in uploads:
+            if resume_hash in existing or resume_hash in pending:
+                await run_in_threadpool(discard_upload, temp_path)
+                if resume_hash in existing:
+                    duplicates.append(existing[resume_hash])
+                else:
+                    repeated.append(resume_hash)
+                continue
+            key = await run_in_threadpool(storage.put_file, temp_path, resume_hash, Path(file_name).suffix)
+            uncommitted_keys.append(key)
+            pending[resume_hash] = (file_name, key)
+
+        # Parse all resumes in isolated workers; outcomes come back in order and failures are reported per file
+        parse_hashes = list(pending)
+        outcomes = await parse_resumes([storage.path(pending[resume_hash][1]) for resume_hash in parse_hashes]) if parse_hashes else []
+        parsed = list(zip(parse_hashes, outcomes))
+        failed = rejected + [
+            {"file_name": pending[resume_hash][0], "status": outcome["status"], "detail": outcome["error"]}
+            for resume_hash, outcome in parsed if outcome["status"] != "ok"
+        ]
+        # Files that could not be parsed are not referenced by any resume
+        for resume_hash, outcome in parsed:
+            if outcome["status"] != "ok":
+                uncommitted_keys.remove(pending[resume_hash][1])
+                await run_in_threadpool(storage.release, pending[resume_hash][1])
+
+        # Save to database in a single transaction. A file inserted by a concurrent request
+        # in the meantime hits the unique hash index; the transaction is then rolled back,
+        # that file reported as a duplicate and the rest inserted again. (Savepoints are not
+        # used: pysqlite runs a SAVEPOINT issued before any write outside a transaction, so
+        # its RELEASE would commit the row early.)
+        to_save = [(resume_hash, outcome) for resume_hash, outcome in parsed if outcome["status"] == "ok"]
+        while True:
+            resumes = []
+            for resume_hash, outcome in to_save:
+                resume_data = outcome["data"]
+                resumes.append((Resume(
+                    name=resume_data.get("name", "Unknown"),
+                    email=resume_data.get("email", ""),
+                    phone=resume_data.get("phone", ""),
+                    skills=", ".join(resume_data.get("skills", [])),
+                    experience=resume_data.get("experience", ""),
+                    experience_signature=resume_data.get("experience_signature"),
+                    skill_set=pack_skills(resume_data.get("skills", [])),
+                    education=resume_data.get("education", ""),
+                    file_path=pending[resume_hash][1],
+                    content_hash=resume_hash,
+                    parser_version=PARSER_VERSION,
+                    skills_indexed=True
+                ), outcome))
+            db.add_all(resume for resume, _ in resumes)
+            try:
+                db.flush()
+                break
+            except IntegrityError:
+                db.rollback()
+                taken = {
+                    resume.content_hash: resume for resume in db.query(Resume).filter(
+                        Resume.content_hash.in_([resume_hash for resume_hash, _ in to_save])
+                    ).all()
+                }
+                if not taken:
+                    raise
+                for resume_hash in taken:
+                    uncommitted_keys.remove(pending[resume_hash][1])
+                    await run_in_threadpool(storage.release, pending[resume_hash][1])
+                duplicates += taken.values()
+                to_save = [(resume_hash, outcome) for resume_hash, outcome in to_save if resume_hash not in taken]
+
+        for resume, outcome in resumes:
+            for skill in normalize_skills(outcome["data"].get("skills", [])):
+                db.add(SkillPosting(skill=skill, candidate_id=resume.id))
+        db.commit()
+        uncommitted_keys.clear()
 
-        return {"status": "success", "message": f"{len(results)} resume(s) processed successfully", "resumes": results}
+        # Keep the extracted text so fields can be re-derived without re-opening the files
+        await run_in_threadpool(
+            store_extracted_texts, [(resume.content_hash, outcome["text"]) for resume, outcome in resumes]
+        )
+
+        # Keep the inverted skill index current once the rows are committed
+        for resume, outcome in resumes:
+            skill_index.add(resume.id, outcome["data"].get("skills", []))
+        saved = {resume.content_hash: resume for resume, _ in resumes}
+        duplicates += [saved[resume_hash] for resume_hash in repeated if resume_hash in saved]
+        results = [uploaded_resume_to_dict(resume, duplicate=False) for resume, _ in resumes]
+        results += [uploaded_resume_to_dict(resume, duplicate=True) for resume in duplicates]
+
+        return {
+            "status": "success",
+            "message": f"{len(resumes)} resume(s) processed successfully, {len(duplicates)} already on file",
+            "resumes": results,
+            "failed": failed
+        }
     except Exception as e:
+        db.rollback()
+        # No row references the files stored for this request, so drop their references
+        storage = get_storage()
+        for key in uncommitted_keys:
+            try:
+                await run_in_threadpool(storage.release, key)
+            except Exception as release_error:
+                print(f"Error releasing stored file {key}: {str(release_error)}")
         return JSONResponse(
             status_code=500,
             content={"status": "error", "detail": str(e)}
@@ -214,8 +511,10 @@ async def match_candidate(
     db: Session = Depends(get_db)
 ):
     try:
-        job = db.query(JobDescription).filter(JobDescription.id == request.job_id).first()
-        candidate = db.query(Resume).filter(Resume.id == request.candidate_id).first()
+        trace = MatchTrace()
+        with trace.stage("db_lookup"):
+            job = db.query(JobDescription).filter(JobDescription.id == request.job_id).first()
+            candidate = db.query(Resume).filter(Resume.id == request.candidate_id).first()
 
         if not job or not candidate:
             return JSONResponse(
@@ -223,11 +522,16 @@ async def match_candidate(
                 content={"status": "error", "detail": "Job or candidate not found"}
             )
 
-        matcher = CandidateMatcher()
-        match_score = matcher.calculate_match_score(job, candidate)
+        components = await run_in_threadpool(
+            calculate_component_scores, job_to_dict(job), resume_to_dict(candidate), trace
+        )
+        match_score = combine_scores(components)
+        with trace.stage("db_write"):
+            save_match_results(db, request.job_id, [dict(components, candidate_id=request.candidate_id)])
+            db.commit()
 
         # Save to shortlisted candidates if score is high enough
-        shortlisted = match_score >= 80
+        shortlisted = match_score >= SHORTLIST_THRESHOLD
         if shortlisted:
             # Check if already shortlisted
             existing = db.query(ShortlistedCandidate).filter(
@@ -244,13 +548,95 @@ async def match_candidate(
                 db.add(shortlisted_candidate)
                 db.commit()
 
-        return {
+        explain = trace.finish()
+        response = {
             "status": "success", 
             "job_id": request.job_id,
             "candidate_id": request.candidate_id,
             "match_score": match_score,
             "shortlisted": shortlisted
         }
+        if request.explain:
+            response["explain"] = dict(explain, components=components)
+        return response
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"status": "error", "detail": str(e)}
+        )
+
+@app.post("/api/match/batch")
+async def match_candidates_batch(
+    request: BatchMatchRequest,
+    db: Session = Depends(get_db)
+):
+    try:
+        job = db.query(JobDescription).filter(JobDescription.id == request.job_id).first()
+        if not job:
+            return JSONResponse(
+                status_code=404,
+                content={"status": "error", "detail": "Job not found"}
+            )
+
+        if request.mode == "cascade":
+            query = db.query(
+                Resume.id, Resume.name, Resume.skills, Resume.skill_set, Resume.experience, Resume.experience_signature
+            )
+        else:
+            query = db.query(Resume.id, Resume.name, Resume.skills, Resume.skill_set)
+        if request.candidate_ids:
+            query = query.filter(Resume.id.in_(request.candidate_ids))
+
+        candidates = []
+        names = {}
+        taxonomy = get_taxonomy()
+        for row in query.all():
+            candidate = {"id": row.id, "skills": split_skills(row.skills), "skill_set": taxonomy.unpack(row.skill_set)}
+            if request.mode == "cascade":
+                candidate["experience"] = row.experience or ""
+                candidate["experience_signature"] = row.experience_signature
+            candidates.append(candidate)
+            names[row.id] = row.name
+
+        jd_data = job_to_dict(job)
+        stats = None
+        if request.mode == "cascade":
+            cascade = await run_in_threadpool(
+                cascade_match_scores, jd_data, candidates, request.llm_top_n
+            )
+            ranked = cascade["results"][:request.top_k]
+            stats = cascade["stats"]
+
+            # Keep components of every evaluated pair, and shortlist the same way /api/match does
+            save_match_results(db, request.job_id, cascade["results"])
+            for result in cascade["results"]:
+                if result["match_score"] is None or result["match_score"] < SHORTLIST_THRESHOLD:
+                    continue
+                existing = db.query(ShortlistedCandidate).filter(
+                    ShortlistedCandidate.job_id == request.job_id,
+                    ShortlistedCandidate.candidate_id == result["candidate_id"]
+                ).first()
+                if not existing:
+                    db.add(ShortlistedCandidate(
+                        job_id=request.job_id,
+                        candidate_id=result["candidate_id"],
+                        match_score=result["match_score"]
+                    ))
+            db.commit()
+        else:
+            ranked = rank_candidates(jd_data, candidates, top_k=request.top_k)
+
+        for entry in ranked:
+            entry["candidate_name"] = names[entry["candidate_id"]]
+
+        return {
+            "status": "success",
+            "job_id": request.job_id,
+            "mode": request.mode,
+            "evaluated": len(candidates),
+            "stats": stats,
+            "candidates": ranked
+        }
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -351,6 +737,133 @@ async def get_candidates(db: Session = Depends(get_db)):
             content={"status": "error", "detail": str(e)}
         )
 
+# Get candidates sharing at least `min_shared` required skills with a job
+@app.get("/api/jobs/{job_id}/candidates")
+async def get_job_candidates(
+    job_id: int,
+    min_shared: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    try:
+        job = db.query(JobDescription).filter(JobDescription.id == job_id).first()
+        if not job:
+            return JSONResponse(
+                status_code=404,
+                content={"status": "error", "detail": "Job not found"}
+            )
+
+        total, page = skill_index.candidates_for(split_skills(job.requirements), min_shared=min_shared, limit=limit)
+        candidates = {
+            candidate.id: candidate
+            for candidate in db.query(Resume).filter(Resume.id.in_([candidate_id for candidate_id, _ in page])).all()
+        }
+
+        candidate_list = []
+        for candidate_id, shared_skills in page:
+            candidate = candidates.get(candidate_id)
+            if candidate is None:
+                continue
+            candidate_list.append({
+                "id": candidate.id,
+                "name": candidate.name,
+                "email": candidate.email,
+                "skills": candidate.skills,
+                "shared_skills": shared_skills
+            })
+
+        return {"status": "success", "job_id": job_id, "total": total, "candidates": candidate_list}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"status": "error", "detail": str(e)}
+        )
+
+# Create a new version of a weight profile
+@app.post("/api/weight-profiles")
+async def create_weight_profile(request: WeightProfileRequest, db: Session = Depends(get_db)):
+    try:
+        latest = db.query(func.max(WeightProfile.version)).filter(WeightProfile.name == request.name).scalar()
+        profile = WeightProfile(
+            name=request.name,
+            version=(latest or 0) + 1,
+            skill_weight=request.skill_weight,
+            experience_weight=request.experience_weight,
+            qualification_weight=request.qualification_weight,
+            shortlist_threshold=request.shortlist_threshold
+        )
+        db.add(profile)
+        db.commit()
+        db.refresh(profile)
+        return {"status": "success", "profile": weight_profile_to_dict(profile)}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"status": "error", "detail": str(e)}
+        )
+
+# Get all weight profiles
+@app.get("/api/weight-profiles")
+async def get_weight_profiles(db: Session = Depends(get_db)):
+    try:
+        profiles = db.query(WeightProfile).order_by(WeightProfile.name, WeightProfile.version).all()
+        return {"status": "success", "profiles": [weight_profile_to_dict(profile) for profile in profiles]}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"status": "error", "detail": str(e)}
+        )
+
+# Rank stored match results for a job under a weight profile, without rescoring
+@app.get("/api/jobs/{job_id}/rankings")
+async def get_job_rankings(job_id: int, profile_id: Optional[int] = None, limit: int = 100, db: Session = Depends(get_db)):
+    try:
+        if profile_id is None:
+            profile = db.query(WeightProfile).filter(WeightProfile.name == "default").order_by(WeightProfile.version.desc()).first()
+        else:
+            profile = db.query(WeightProfile).filter(WeightProfile.id == profile_id).first()
+        if not profile:
+            return JSONResponse(
+                status_code=404,
+                content={"status": "error", "detail": "Weight profile not found"}
+            )
+
+        # Components pruned by the cascade count as zero
+        score = func.round(
+            MatchResult.skill_score * profile.skill_weight +
+            func.coalesce(MatchResult.experience_score, 0) * profile.experience_weight +
+            func.coalesce(MatchResult.qualification_score, 0) * profile.qualification_weight,
+            2
+        ).label("score")
+        rankings_query = db.query(
+            MatchResult, Resume.name, score
+        ).join(
+            Resume, MatchResult.candidate_id == Resume.id
+        ).filter(
+            MatchResult.job_id == job_id
+        ).order_by(
+            score.desc()
+        ).limit(limit).all()
+
+        rankings = []
+        for result, candidate_name, match_score in rankings_query:
+            rankings.append({
+                "candidate_id": result.candidate_id,
+                "candidate_name": candidate_name,
+                "skill_score": result.skill_score,
+                "experience_score": result.experience_score,
+                "qualification_score": result.qualification_score,
+                "match_score": match_score,
+                "shortlisted": match_score >= profile.shortlist_threshold
+            })
+
+        return {"status": "success", "job_id": job_id, "profile": weight_profile_to_dict(profile), "rankings": rankings}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"status": "error", "detail": str(e)}
+        )
+
 # Get shortlisted candidates for a job
 @app.get("/api/shortlisted/{job_id}")
 async def get_shortlisted(job_id: int, db: Session = Depends(get_db)):
@@ -433,6 +946,197 @@ async def get_interviews(db: Session = Depends(get_db)):
             content={"status": "error", "detail": str(e)}
         )
 
+# Skills are stored as a comma-joined string, see upload_resume
+def split_skills(skills):
+    if not skills:
+        return []
+    return [skill.strip() for skill in skills.split(",") if skill.strip()]
+
+# Skill sets are encoded once when a resume or JD is stored; matching reads them back with unpack.
+# A set encoded with an older taxonomy file unpacks to None and is re-encoded from the names.
+def pack_skills(skills):
+    taxonomy = get_taxonomy()
+    return taxonomy.pack(taxonomy.skill_set(skills))
+
+# LLM qualification score cache counters
+@app.get("/api/llm-cache/stats")
+async def get_llm_cache_stats():
+    return {"status": "success", "cache": get_score_cache().stats()}
+
+# Per-stage latency histograms of the match pipeline
+@app.get("/api/metrics")
+async def get_metrics():
+    return {"status": "success", "histograms": stage_histograms.snapshot(), "counters": path_counters.snapshot()}
+
+# LLM gateway queue and circuit breaker state
+@app.get("/api/llm/status")
+async def get_llm_status():
+    return {"status": "success", "gateway": get_gateway().stats()}
+
+# Progress of the resume re-parse backfill
+@app.get("/api/resumes/backfill")
+async def get_resume_backfill_status():
+    return {"status": "success", "backfill": resume_backfill.status()}
+
+@app.post("/api/resumes/backfill")
+async def start_resume_backfill_run():
+    started = resume_backfill.start()
+    return {
+        "status": "success",
+        "message": "Backfill started" if started else "Backfill already running",
+        "backfill": resume_backfill.status()
+    }
+
+def process_jd_task(task):
+    """
+    Summarize a queued job description and fill in its row; runs on a JD worker thread.
+
+    Returns a note for the task status when only the start of a long JD was summarized.
+    """
+    payload = task["payload"]
+    file_path = stored_file_path(payload.get("storage_key") or payload.get("file_path"))
+    if file_path is None:
+        raise FileNotFoundError("Stored job description file is missing")
+    # A failed summary fails the attempt, so the queue retries it or records the failure
+    summary = summarize_job_description(read_job_description(file_path), raise_errors=True)
+    db = SessionLocal()
+    try:
+        job = db.query(JobDescription).filter(JobDescription.id == task["job_id"]).first()
+        if job:
+            job.title = summary["title"] or "Untitled"
+            job.description = "\n".join(summary["responsibilities"])
+            job.responsibilities = job.description
+            job.required_experience = summary["experience"]
+            job.requirements = ", ".join(summary["skills"])
+            job.skill_set = pack_skills(summary["skills"])
+            db.commit()
+    finally:
+        db.close()
+    truncated = summary.get("truncated")
+    if truncated:
+        return f"Job description truncated: summarized the first {truncated['summarized']} of {truncated['parts']} parts"
+    return None
+
+jd_workers = TaskWorkerPool(jd_task_queue, process_jd_task)
+
+def jd_processing_status(job):
+    task = jd_task_queue.latest_for_job(job.id, db=object_session(job))
+    # Every job gets its task in the same transaction; "missing" means the row was written some other way
+    processing_status = task["status"] if task else "missing"
+    status = {
+        "job_id": job.id,
+        "processing_status": processing_status,
+        "attempts": task["attempts"] if task else 0,
+        "error": task["error"] if task and processing_status in ("queued", "failed") else None
+    }
+    if processing_status == "missing":
+        status["error"] = "No processing task recorded for this job description"
+    if processing_status in ("done", "legacy"):
+        status.update({"title": job.title, "description": job.description, "requirements": job.requirements})
+        if task and task["note"]:
+            status["note"] = task["note"]
+    return status
+
+def duplicate_jd_response(job):
+    return {
+        "status": "success",
+        "message": "Job description already uploaded",
+        "duplicate": True,
+        **jd_processing_status(job)
+    }
+
+def load_jd_processing_status(job_id: int):
+    db = SessionLocal()
+    try:
+        job = db.query(JobDescription).filter(JobDescription.id == job_id).first()
+        return jd_processing_status(job) if job else None
+    finally:
+        db.close()
+
+def job_to_dict(job):
+    return {
+        "title": job.title,
+        "description": job.description,
+        "skills": split_skills(job.requirements),
+        "skill_set": get_taxonomy().unpack(job.skill_set),
+        "experience": job.requirements or ""
+    }
+
+def resume_to_dict(candidate):
+    return {
+        "id": candidate.id,
+        "name": candidate.name,
+        "skills": split_skills(candidate.skills),
+        "skill_set": get_taxonomy().unpack(candidate.skill_set),
+        "experience": candidate.experience or "",
+        "experience_signature": candidate.experience_signature,
+        "education": candidate.education or ""
+    }
+
+def store_extracted_texts(texts):
+    text_store = get_text_store()
+    for content_hash, text in texts:
+        try:
+            text_store.put(content_hash, text or "", TEXT_EXTRACTION_VERSION)
+        except Exception as e:
+            print(f"Error storing extracted text: {str(e)}")
+
+def uploaded_resume_to_dict(resume, duplicate: bool):
+    return {
+        "id": resume.id,
+        "name": resume.name,
+        "email": resume.email,
+        "phone": resume.phone,
+        "skills": resume.skills,
+        "experience": resume.experience,
+        "education": resume.education,
+        "duplicate": duplicate
+    }
+
+def weight_profile_to_dict(profile):
+    return {
+        "id": profile.id,
+        "name": profile.name,
+        "version": profile.version,
+        "skill_weight": profile.skill_weight,
+        "experience_weight": profile.experience_weight,
+        "qualification_weight": profile.qualification_weight,
+        "shortlist_threshold": profile.shortlist_threshold
+    }
+
+# Store or refresh component scores for evaluated candidates of a job; the caller commits.
+# Components left as None (pruned by the cascade) keep any earlier stored value.
+def save_match_results(db, job_id, results):
+    # A concurrent request may insert the same (job, candidate) pair first; the
+    # savepoint lets the second attempt update the row it inserted instead
+    for attempt in range(2):
+        savepoint = db.begin_nested()
+        try:
+            upsert_match_results(db, job_id, results)
+            savepoint.commit()
+            return
+        except IntegrityError:
+            savepoint.rollback()
+            if attempt:
+                raise
+
+def upsert_match_results(db, job_id, results):
+    candidate_ids = [components["candidate_id"] for components in results]
+    existing = {
+        result.candidate_id: result
+        for result in db.query(MatchResult).filter(
+            MatchResult.job_id == job_id, MatchResult.candidate_id.in_(candidate_ids)
+        ).all()
+    }
+    for components in results:
+        result = existing.get(components["candidate_id"])
+        if not result:
+            result = MatchResult(job_id=job_id, candidate_id=components["candidate_id"])
+            db.add(result)
+        for field in ("skill_score", "experience_score", "qualification_score"):
+            if components[field] is not None:
+                setattr(result, field, components[field])
+
 # Function to send interview invitation (dummy implementation)
 def send_interview_invitation(email, name, job_title, interview_datetime):
     # In a real-world application, you'd use SMTP or an email service
@@ -1,29 +1,178 @@
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 from difflib import SequenceMatcher
-import ollama
+import json
+import os
+import numpy as np
+from text_sketch import cached_minhash_signature, minhash_signature, signature_similarity
+from llm_cache import get_score_cache, make_cache_key
+from llm_gateway import estimate_tokens, get_gateway
+from skill_taxonomy import SkillSet, get_taxonomy
+from pipeline_metrics import MatchTrace, timed
+from stream_parsers import JSONObjectParser, ScoreParser
 
-def calculate_skill_match(jd_skills: list, resume_skills: list) -> float:
-    """Calculate skill match percentage."""
-    if not jd_skills:
+# "minhash" compares precomputed signatures, "sequence" keeps the original SequenceMatcher path
+EXPERIENCE_SIMILARITY = os.getenv('EXPERIENCE_SIMILARITY', 'minhash')
+
+# Component weights of the final match score, also the "default" weight profile
+SKILL_WEIGHT = 0.4
+EXPERIENCE_WEIGHT = 0.3
+QUALIFICATION_WEIGHT = 0.3
+
+# Candidates at or above this score are shortlisted
+SHORTLIST_THRESHOLD = 80
+
+QUALIFICATION_MODEL = "llama2"
+# Bump whenever the qualification prompt changes so cached scores are not reused
+QUALIFICATION_PROMPT_VERSION = "1"
+QUALIFICATION_BATCH_PROMPT_VERSION = "1"
+
+# Batched qualification scoring: the model's context window, the most candidates
+# per prompt, and how much of each candidate's experience goes into the prompt
+QUALIFICATION_CONTEXT_TOKENS = int(os.getenv('QUALIFICATION_CONTEXT_TOKENS', 4096))
+QUALIFICATION_MAX_BATCH = int(os.getenv('QUALIFICATION_MAX_BATCH', 8))
+QUALIFICATION_PROFILE_CHARS = int(os.getenv('QUALIFICATION_PROFILE_CHARS', 1200))
+# Output tokens reserved per candidate for its {"id": n, "score": x} row, which takes
+# about 15 tokens compact and more when the model indents its JSON, plus the wrapper object
+_BATCH_TOKENS_PER_ROW = 32
+_BATCH_TOKENS_OVERHEAD = 64
+
+def calculate_skill_match(jd_skills: list, resume_skills: list, jd_skill_set: Optional[SkillSet] = None,
+                          resume_skill_set: Optional[SkillSet] = None) -> float:
+    """
+    Calculate skill match percentage over distinct canonical skills.
+
+    Pass the skill sets stored at ingest to skip re-encoding the lists.
+    """
+    taxonomy = get_taxonomy()
+    jd_set = jd_skill_set if jd_skill_set is not None else taxonomy.skill_set(jd_skills)
+    if not jd_set.size:
         return 0.0
-    
-    matched_skills = sum(1 for skill in jd_skills if skill.lower() in [s.lower() for s in resume_skills])
-    return (matched_skills / len(jd_skills)) * 100
 
-def calculate_experience_match(jd_experience: str, resume_experience: str) -> float:
+    resume_set = resume_skill_set if resume_skill_set is not None else taxonomy.skill_set(resume_skills)
+    return (jd_set.overlap(resume_set) / jd_set.size) * 100
+
+def build_skill_matrix(jd_set: SkillSet, resumes_skills: List[list],
+                       resume_skill_sets: Optional[List[Optional[SkillSet]]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Packs a batch of resume skill sets into matrices for matching against one job.
+
+    Args:
+        jd_set (SkillSet): The job's skill set
+        resumes_skills (List[list]): Skill lists, one per resume
+        resume_skill_sets (Optional[List[Optional[SkillSet]]]): Stored skill sets, one per resume;
+            resumes without one are encoded from their skill list
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: A (resumes x words) uint64 matrix of each resume's
+        taxonomy bits, limited to the words the JD bitset spans, and a (resumes x JD
+        skills outside the taxonomy) 0/1 matrix
+    """
+    taxonomy = get_taxonomy()
+    words = max((jd_set.bits.bit_length() + 63) // 64, 1)
+    mask = (1 << (words * 64)) - 1
+    unknown = sorted(jd_set.unknown)
+
+    packed, unknown_rows = [], []
+    for row, resume_skills in enumerate(resumes_skills):
+        resume_set = resume_skill_sets[row] if resume_skill_sets is not None else None
+        if resume_set is None:
+            resume_set = taxonomy.skill_set(resume_skills)
+        packed.append((resume_set.bits & mask).to_bytes(words * 8, 'little'))
+        if unknown:
+            unknown_rows.append([skill in resume_set.unknown for skill in unknown])
+
+    bits = np.frombuffer(b"".join(packed), dtype='<u8').reshape(len(resumes_skills), words)
+    incidence = np.array(unknown_rows, dtype=np.uint8).reshape(len(resumes_skills), len(unknown))
+    return bits, incidence
+
+def calculate_skill_match_batch(jd_skills: list, resumes_skills: List[list], jd_skill_set: Optional[SkillSet] = None,
+                                resume_skill_sets: Optional[List[Optional[SkillSet]]] = None) -> np.ndarray:
+    """
+    Calculate skill match percentages for many resumes.
+
+    The resume bitsets are packed into a uint64 matrix by `build_skill_matrix`,
+    ANDed with the JD bitset in one operation and popcounted per row.
+    """
+    taxonomy = get_taxonomy()
+    jd_set = jd_skill_set if jd_skill_set is not None else taxonomy.skill_set(jd_skills)
+    if not jd_set.size:
+        return np.zeros(len(resumes_skills), dtype=np.float64)
+
+    bits, incidence = build_skill_matrix(jd_set, resumes_skills, resume_skill_sets)
+    jd_words = np.frombuffer(jd_set.bits.to_bytes(bits.shape[1] * 8, 'little'), dtype='<u8')
+    matched_skills = np.bitwise_count(np.bitwise_and(bits, jd_words)).sum(axis=1, dtype=np.int64)
+    matched_skills += incidence.sum(axis=1, dtype=np.int64)
+    return (matched_skills / jd_set.size) * 100
+
+def rank_candidates(jd_data: Dict, candidates: List[Dict], top_k: Optional[int] = 10) -> List[Dict]:
+    """
+    Ranks a pool of candidates against a job description by skill match.
+
+    Args:
+        jd_data (Dict): Job description data
+        candidates (List[Dict]): Resume data, each with an 'id' and a 'skills' list
+        top_k (Optional[int]): Number of candidates to return, or None for all
+
+    Returns:
+        List[Dict]: The best candidates, highest skill score first
+    """
+    if not candidates:
+        return []
+
+    scores = calculate_skill_match_batch(
+        jd_data.get('skills', []),
+        [candidate.get('skills', []) for candidate in candidates],
+        jd_data.get('skill_set'),
+        [candidate.get('skill_set') for candidate in candidates]
+    )
+
+    # Stable sort keeps the input order for candidates with equal scores
+    order = np.argsort(-scores, kind='stable')
+    if top_k is not None:
+        order = order[:top_k]
+
+    return [
+        {
+            "candidate_id": candidates[index].get('id'),
+            "skill_score": float(scores[index])
+        }
+        for index in order
+    ]
+
+def calculate_experience_match(jd_experience: str, resume_experience: str,
+                               resume_signature: Optional[bytes] = None,
+                               mode: Optional[str] = None) -> float:
     """Calculate experience match using text similarity."""
     if not jd_experience or not resume_experience:
         return 0.0
-    
-    # Use SequenceMatcher for text similarity
-    similarity = SequenceMatcher(None, jd_experience.lower(), resume_experience.lower()).ratio()
+
+    if (mode or EXPERIENCE_SIMILARITY) == 'sequence':
+        # Use SequenceMatcher for text similarity
+        similarity = SequenceMatcher(None, jd_experience.lower(), resume_experience.lower()).ratio()
+        return similarity * 100
+
+    # Compare MinHash signatures; resumes carry theirs from parse time
+    if not resume_signature:
+        resume_signature = minhash_signature(resume_experience)
+    similarity = signature_similarity(cached_minhash_signature(jd_experience), resume_signature)
     return similarity * 100
 
-def analyze_qualifications(jd_text: str, resume_text: str) -> float:
+def profile_text(data: Dict) -> str:
+    """Render job or resume data for an LLM prompt, leaving out encoded fields such as signatures."""
+    return str({key: value for key, value in data.items() if not isinstance(value, (bytes, bytearray, SkillSet))})
+
+def analyze_qualifications(jd_text: str, resume_text: str, trace: Optional[MatchTrace] = None) -> float:
     """Use Ollama to analyze overall qualifications match."""
     try:
-        client = ollama.Client()
-        
+        # Cache errors are reported as misses, never raised
+        cache = get_score_cache()
+        cache_key = make_cache_key(QUALIFICATION_MODEL, QUALIFICATION_PROMPT_VERSION, jd_text, resume_text)
+        cached_score = cache.get(cache_key)
+        if trace is not None:
+            trace.record("qualification_cache", "hit" if cached_score is not None else "miss")
+        if cached_score is not None:
+            return cached_score
+
         prompt = f"""
         Analyze how well the candidate's qualifications match the job requirements.
         Return a score between 0 and 100.
@@ -37,56 +186,350 @@ def analyze_qualifications(jd_text: str, resume_text: str) -> float:
         Return only the numerical score.
         """
         
-        response = client.generate(
-            model="llama2",
-            prompt=prompt
-        )
-        
+        # Stream the answer and stop as soon as a score has appeared
+        parser = ScoreParser()
+        response = get_gateway().generate(prompt, model=QUALIFICATION_MODEL, stop_when=parser.feed)
+        if trace is not None:
+            trace.record("llm_latency_ms", round(response.latency_ms, 3))
+            trace.record("llm_prompt_tokens", response.prompt_tokens)
+            trace.record("llm_completion_tokens", response.completion_tokens)
+            trace.record("llm_stopped_early", response.stopped_early)
+        if response.fallback:
+            if trace is not None:
+                trace.record("qualification_fallback", response.error)
+            return 50.0  # Model unavailable or too slow
+
         # Extract numerical score from response
-        try:
-            score = float(response.text.strip())
-            return min(max(score, 0), 100)  # Ensure score is between 0 and 100
-        except ValueError:
+        score = parser.finish()
+        if score is None:
+            if trace is not None:
+                trace.record("qualification_fallback", "unparseable response")
             return 50.0  # Default score if parsing fails
+        score = min(max(score, 0), 100)  # Ensure score is between 0 and 100
+
+        # Only real model answers are cached, never the fallback
+        cache.set(cache_key, score)
+        return score
             
     except Exception as e:
         print(f"Error in qualification analysis: {str(e)}")
+        if trace is not None:
+            trace.record("qualification_fallback", str(e))
         return 50.0
 
-def calculate_match_score(jd_data: Dict, resume_data: Dict) -> float:
+def condensed_profile(data: Dict) -> str:
+    """Short candidate profile for batched prompts: skills, education and the start of the experience."""
+    skills = data.get('skills') or []
+    if isinstance(skills, str):
+        skills = [skill.strip() for skill in skills.split(',') if skill.strip()]
+    lines = [f"Skills: {', '.join(skills)}"]
+    education = " ".join((data.get('education') or '').split())
+    if education:
+        lines.append(f"Education: {education[:300]}")
+    experience = " ".join((data.get('experience') or '').split())
+    if experience:
+        lines.append(f"Experience: {experience[:QUALIFICATION_PROFILE_CHARS]}")
+    return "\n".join(lines)
+
+def _batch_prompt(jd_text: str, profiles: List[str]) -> str:
+    candidates = "\n\n".join(f"Candidate {number}:\n{profile}" for number, profile in enumerate(profiles, start=1))
+    return f"""
+        Analyze how well each candidate's qualifications match the job requirements.
+        Give each candidate a score between 0 and 100.
+
+        Job Description:
+        {jd_text}
+
+        {candidates}
+
+        Respond with JSON only, one entry per candidate:
+        {{"scores": [{{"id": <candidate number>, "score": <0-100>}}]}}
+        """
+
+def _next_batch(jd_text: str, profiles: List[str], remaining: List[int], max_batch: int) -> List[int]:
+    # Fill the context window: the JD once, then profiles plus room for each answer row
+    budget = QUALIFICATION_CONTEXT_TOKENS - estimate_tokens(_batch_prompt(jd_text, []))
+    batch, used = [], 0
+    for index in remaining[:max_batch]:
+        cost = estimate_tokens(profiles[index]) + _BATCH_TOKENS_PER_ROW
+        if batch and used + cost > budget:
+            break
+        batch.append(index)
+        used += cost
+    return batch
+
+def _parse_batch_scores(text: str, size: int) -> Optional[Dict[int, float]]:
+    """Return valid scores by position in the batch, or None if the response is not a score list."""
+    try:
+        rows = json.loads(text).get("scores")
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(rows, list):
+        return None
+
+    scores, duplicates = {}, set()
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        number, score = row.get("id"), row.get("score")
+        if isinstance(score, str):
+            try:
+                score = float(score)
+            except ValueError:
+                continue
+        valid = (
+            isinstance(number, int) and not isinstance(number, bool) and 1 <= number <= size
+            and isinstance(score, (int, float)) and not isinstance(score, bool) and 0 <= score <= 100
+        )
+        if not valid:
+            continue
+        if number - 1 in scores:
+            # Two answers for one candidate: trust neither
+            duplicates.add(number - 1)
+        scores[number - 1] = float(score)
+    return {position: score for position, score in scores.items() if position not in duplicates}
+
+def analyze_qualifications_batch(jd_text: str, resume_texts: List[str],
+                                 trace: Optional[MatchTrace] = None) -> List[float]:
     """
-    Calculates a match score between a job description and a resume.
-    
+    Scores many candidates against one job, sending the JD once per group of candidates.
+
+    Groups hold at most QUALIFICATION_MAX_BATCH profiles and are packed to fit
+    QUALIFICATION_CONTEXT_TOKENS. The model answers with a JSON list of
+    scores. Rows that are missing or invalid are re-scored one at a time with
+    `analyze_qualifications`. A response that is not a score list at all,
+    or a call that timed out or failed, halves the group size for the rest
+    of the call, down to one candidate per call. Only an open circuit
+    breaker gives a group the neutral 50 without retrying.
+
+    Args:
+        jd_text (str): Job description text
+        resume_texts (List[str]): Candidate profiles, e.g. from `condensed_profile`
+        trace (Optional[MatchTrace]): Collects cache hits, call counts and fallbacks
+
+    Returns:
+        List[float]: One score out of 100 per profile, in order
+    """
+    cache = get_score_cache()
+    keys = [
+        make_cache_key(QUALIFICATION_MODEL, QUALIFICATION_BATCH_PROMPT_VERSION, jd_text, resume_text)
+        for resume_text in resume_texts
+    ]
+    scores = [cache.get(key) for key in keys]
+    remaining = [index for index, score in enumerate(scores) if score is None]
+    if trace is not None:
+        trace.record("qualification_cache_hits", len(resume_texts) - len(remaining))
+
+    max_batch = max(QUALIFICATION_MAX_BATCH, 1)
+    batch_calls, retry = 0, []
+    while remaining:
+        batch = _next_batch(jd_text, resume_texts, remaining, max_batch)
+        remaining = remaining[len(batch):]
+        if len(batch) == 1:
+            retry.extend(batch)
+            continue
+
+        parser = JSONObjectParser()
+        response = get_gateway().generate(
+            _batch_prompt(jd_text, [resume_texts[index] for index in batch]),
+            model=QUALIFICATION_MODEL, format="json", stop_when=parser.feed,
+            options={"num_predict": _BATCH_TOKENS_PER_ROW * len(batch) + _BATCH_TOKENS_OVERHEAD}
+        )
+        batch_calls += 1
+        if response.fallback and trace is not None:
+            trace.record("qualification_fallback", response.error)
+        if response.fallback and response.error == "circuit open":
+            # The server is known to be down; smaller calls would fail fast the same way
+            for index in batch:
+                scores[index] = 50.0
+            continue
+
+        # A timeout may just mean the group was too big to answer in time
+        batch_scores = None if response.fallback else _parse_batch_scores(parser.value, len(batch))
+        if batch_scores is None:
+            max_batch = max(len(batch) // 2, 1)
+            remaining = batch + remaining
+            continue
+        for position, index in enumerate(batch):
+            if position in batch_scores:
+                scores[index] = batch_scores[position]
+                cache.set(keys[index], batch_scores[position])
+            else:
+                retry.append(index)
+
+    for index in retry:
+        scores[index] = analyze_qualifications(jd_text, resume_texts[index])
+
+    if trace is not None:
+        trace.record("llm_batch_calls", batch_calls)
+        trace.record("llm_single_calls", len(retry))
+        trace.record("llm_calls", batch_calls + len(retry))
+    return scores
+
+def calculate_component_scores(jd_data: Dict, resume_data: Dict, trace: Optional[MatchTrace] = None) -> Dict:
+    """
+    Calculates the individual components of the match score.
+
     Args:
         jd_data (Dict): Job description data
         resume_data (Dict): Resume data
-        
+        trace (Optional[MatchTrace]): Collects stage timings and explain details
+
     Returns:
-        float: Match score out of 100%
+        Dict: Skill, experience and qualification scores, each out of 100
     """
-    try:
-        # Calculate individual component scores
-        skill_score = calculate_skill_match(jd_data.get('skills', []), resume_data.get('skills', []))
+    with timed(trace, "skills"):
+        skill_score = calculate_skill_match(
+            jd_data.get('skills', []), resume_data.get('skills', []),
+            jd_data.get('skill_set'), resume_data.get('skill_set')
+        )
+    with timed(trace, "experience"):
         experience_score = calculate_experience_match(
             jd_data.get('experience', ''),
-            resume_data.get('experience', '')
+            resume_data.get('experience', ''),
+            resume_data.get('experience_signature')
         )
-        
-        # Get AI-based qualification analysis
+    if trace is not None:
+        trace.record("experience_similarity", EXPERIENCE_SIMILARITY)
+
+    # Get AI-based qualification analysis
+    with timed(trace, "qualifications"):
         qualification_score = analyze_qualifications(
-            str(jd_data),
-            str(resume_data)
-        )
-        
-        # Weighted average of scores
-        final_score = (
-            skill_score * 0.4 +      # Skills weight: 40%
-            experience_score * 0.3 +  # Experience weight: 30%
-            qualification_score * 0.3  # Qualifications weight: 30%
+            profile_text(jd_data),
+            profile_text(resume_data),
+            trace
         )
+
+    return {
+        "skill_score": skill_score,
+        "experience_score": experience_score,
+        "qualification_score": qualification_score
+    }
+
+def combine_scores(components: Dict, skill_weight: float = SKILL_WEIGHT,
+                   experience_weight: float = EXPERIENCE_WEIGHT,
+                   qualification_weight: float = QUALIFICATION_WEIGHT) -> float:
+    """Weighted average of component scores, rounded to two decimals."""
+    final_score = (
+        components["skill_score"] * skill_weight +
+        components["experience_score"] * experience_weight +
+        components["qualification_score"] * qualification_weight
+    )
+    return round(final_score, 2)
+
+def calculate_match_score(jd_data: Dict, resume_data: Dict) -> float:
+    """
+    Calculates a match score between a job description and a resume.
+    
+    Args:
+        jd_data (Dict): Job description data
+        resume_data (Dict): Resume data
         
-        return round(final_score, 2)
+    Returns:
+        float: Match score out of 100%
+    """
+    try:
+        return combine_scores(calculate_component_scores(jd_data, resume_data))
         
     except Exception as e:
         print(f"Error calculating match score: {str(e)}")
-        return 0.0 
\ No newline at end of file
+        return 0.0
+
+def cascade_match_scores(jd_data: Dict, candidates: List[Dict], llm_top_n: int = 20,
+                         min_skill_score: Optional[float] = None,
+                         shortlist_threshold: float = SHORTLIST_THRESHOLD) -> Dict:
+    """
+    Scores a candidate pool in stages, running the LLM only where it can matter.
+
+    Stage 1 scores skills for everyone in one batch. Stage 2 computes experience
+    similarity for candidates with at least `min_skill_score` (by default, the
+    lowest skill score that can still reach `shortlist_threshold` with perfect
+    experience and qualification scores). Stage 3 runs `analyze_qualifications_batch`
+    for at most `llm_top_n` survivors whose upper-bound score can still reach
+    the threshold, best partial score first, so the JD is sent once per batch
+    of condensed profiles rather than once per candidate.
+
+    Args:
+        jd_data (Dict): Job description data
+        candidates (List[Dict]): Resume data, each with an 'id'
+        llm_top_n (int): Maximum number of candidates scored by the LLM
+        min_skill_score (Optional[float]): Skill score needed to reach stage 2
+        shortlist_threshold (float): Score needed to be shortlisted
+
+    Returns:
+        Dict: Per-candidate results, highest score first, and pruning statistics
+    """
+    if min_skill_score is None:
+        min_skill_score = (shortlist_threshold - 100 * (EXPERIENCE_WEIGHT + QUALIFICATION_WEIGHT)) / SKILL_WEIGHT
+    trace = MatchTrace(pipeline="cascade")
+
+    # Stage 1: skill overlap for the whole pool
+    with trace.stage("skills"):
+        skill_scores = calculate_skill_match_batch(
+            jd_data.get('skills', []),
+            [candidate.get('skills', []) for candidate in candidates],
+            jd_data.get('skill_set'),
+            [candidate.get('skill_set') for candidate in candidates]
+        )
+    results = [
+        {
+            "candidate_id": candidate.get('id'),
+            "skill_score": float(skill_score),
+            "experience_score": None,
+            "qualification_score": None,
+            "match_score": None,
+            "upper_bound": round(
+                float(skill_score) * SKILL_WEIGHT + 100 * (EXPERIENCE_WEIGHT + QUALIFICATION_WEIGHT), 2
+            ),
+            "stage": 1
+        }
+        for candidate, skill_score in zip(candidates, skill_scores)
+    ]
+
+    # Stage 2: text similarity for candidates that can still be shortlisted
+    stage_two = [index for index, result in enumerate(results) if result["skill_score"] >= min_skill_score]
+    with trace.stage("experience"):
+        for index in stage_two:
+            result = results[index]
+            result["experience_score"] = calculate_experience_match(
+                jd_data.get('experience', ''),
+                candidates[index].get('experience', ''),
+                candidates[index].get('experience_signature')
+            )
+            partial_score = result["skill_score"] * SKILL_WEIGHT + result["experience_score"] * EXPERIENCE_WEIGHT
+            result["upper_bound"] = round(partial_score + 100 * QUALIFICATION_WEIGHT, 2)
+            result["stage"] = 2
+
+    # Stage 3: batched LLM analysis for the best survivors whose bound crosses the threshold
+    stage_three = sorted(
+        (index for index in stage_two if results[index]["upper_bound"] >= shortlist_threshold),
+        key=lambda index: -results[index]["upper_bound"]
+    )[:llm_top_n]
+    with trace.stage("qualifications"):
+        qualification_scores = analyze_qualifications_batch(
+            profile_text(jd_data), [condensed_profile(candidates[index]) for index in stage_three], trace
+        ) if stage_three else []
+    for index, qualification_score in zip(stage_three, qualification_scores):
+        result = results[index]
+        result["qualification_score"] = qualification_score
+        result["match_score"] = combine_scores(result)
+        result["stage"] = 3
+
+    # Fully scored candidates first, then the rest by how high they could have scored
+    results.sort(key=lambda result: (
+        result["match_score"] is None,
+        -(result["upper_bound"] if result["match_score"] is None else result["match_score"])
+    ))
+
+    total = len(candidates)
+    return {
+        "results": results,
+        "stats": {
+            "candidates": total,
+            "stage_two": len(stage_two),
+            "llm_candidates": len(stage_three),
+            "llm_calls": trace.details.get("llm_calls", 0),
+            "pruning_ratio": 1 - len(stage_three) / total if total else 0.0,
+            "trace": trace.finish()
+        }
+    }
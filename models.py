@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, ForeignKey, LargeBinary, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -14,20 +14,52 @@ class JobDescription(Base):
     required_skills = Column(String)
     required_experience = Column(String)
     responsibilities = Column(String)
+    file_path = Column(String)  # storage key of the uploaded file, see file_storage.stored_file_path
+    content_hash = Column(String(64), unique=True, index=True)  # SHA-256 of the uploaded text or file
+    skill_set = Column(LargeBinary)  # required skills encoded at summary time, see SkillTaxonomy.pack
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class JobTask(Base):
+    __tablename__ = "job_tasks"
+    
+    id = Column(Integer, primary_key=True)
+    kind = Column(String)
+    job_id = Column(Integer, ForeignKey('job_descriptions.id'), index=True)
+    payload = Column(String)  # JSON
+    status = Column(String, index=True)  # queued, running, done, failed; legacy for jobs summarized before tasks existed
+    attempts = Column(Integer, default=0)
+    error = Column(String)
+    note = Column(String)  # returned by the handler of a completed task, e.g. a truncation warning
+    run_after = Column(DateTime, default=datetime.utcnow)  # not claimed before this, to back off between attempts
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    job = relationship("JobDescription")
+
 class Resume(Base):
     __tablename__ = "resumes"
     
     id = Column(Integer, primary_key=True)
     candidate_name = Column(String)
     email = Column(String)
-    file_path = Column(String)
+    file_path = Column(String)  # storage key, see file_storage.stored_file_path
     education = Column(String)
     skills = Column(String)
     experience = Column(String)
+    experience_signature = Column(LargeBinary)  # MinHash sketch of experience, see text_sketch
+    skill_set = Column(LargeBinary)  # skills encoded at ingest, see SkillTaxonomy.pack
+    content_hash = Column(String(64), unique=True, index=True)  # SHA-256 of the uploaded file
+    parser_version = Column(Integer, index=True)  # resume_parser.PARSER_VERSION that derived the fields
+    skills_indexed = Column(Boolean, default=False, index=True)  # skill_postings written, even if there are no skills
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class SkillPosting(Base):
+    __tablename__ = "skill_postings"
+    
+    id = Column(Integer, primary_key=True)
+    skill = Column(String, index=True)
+    candidate_id = Column(Integer, ForeignKey('resumes.id'), index=True)
+
 class ShortlistedCandidate(Base):
     __tablename__ = "shortlisted_candidates"
     
@@ -41,6 +73,32 @@ class ShortlistedCandidate(Base):
     candidate = relationship("Resume")
     job = relationship("JobDescription")
 
+class WeightProfile(Base):
+    __tablename__ = "weight_profiles"
+    __table_args__ = (UniqueConstraint('name', 'version'),)
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    version = Column(Integer)
+    skill_weight = Column(Float)
+    experience_weight = Column(Float)
+    qualification_weight = Column(Float)
+    shortlist_threshold = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class MatchResult(Base):
+    __tablename__ = "match_results"
+    __table_args__ = (UniqueConstraint('job_id', 'candidate_id'),)
+    
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey('job_descriptions.id'), index=True)
+    candidate_id = Column(Integer, ForeignKey('resumes.id'))
+    skill_score = Column(Float)
+    experience_score = Column(Float)  # null when pruned by the cascade
+    qualification_score = Column(Float)  # null when pruned by the cascade
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class InterviewSchedule(Base):
     __tablename__ = "interview_schedules"
     
@@ -0,0 +1,223 @@
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Dict, List, Optional
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+PARSER_WORKERS = int(os.getenv('PARSER_WORKERS', os.cpu_count() or 1))
+PARSE_TIMEOUT_SECONDS = float(os.getenv('PARSE_TIMEOUT_SECONDS', 30))
+PARSE_MEMORY_LIMIT_MB = int(os.getenv('PARSE_MEMORY_LIMIT_MB', 1024))
+PARSER_MAX_TASKS_PER_WORKER = int(os.getenv('PARSER_MAX_TASKS_PER_WORKER', 100))
+
+def _worker_main(conn, memory_limit_mb: int):
+    """Worker process loop: handle one ("file", path) or ("text", text) task at a time until told to stop."""
+    from resume_parser import derive_resume_fields, parse_resume_file_with_text
+
+    # Limit memory after imports so the limit only has to cover parsing
+    try:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass  # No address-space limits on this platform; timeouts still apply
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        kind, payload = task
+        try:
+            if kind == "text":
+                conn.send(("ok", (derive_resume_fields(payload), None)))
+            else:
+                conn.send(("ok", parse_resume_file_with_text(payload)))
+        except MemoryError:
+            conn.send(("failed", "memory limit exceeded"))
+        except Exception as e:
+            conn.send(("failed", f"{type(e).__name__}: {str(e)}"))
+
+class ParserWorker:
+    """One supervised parser subprocess and its pipe."""
+
+    def __init__(self, context, memory_limit_mb: int):
+        self.context = context
+        self.memory_limit_mb = memory_limit_mb
+        self.process = None
+        self.conn = None
+        self.tasks_done = 0
+
+    def start(self):
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main, args=(child_conn, self.memory_limit_mb), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.tasks_done = 0
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+
+    def restart(self):
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+        self.start()
+
+class ParserPool:
+    """
+    Parses resumes in supervised subprocesses.
+
+    Each file gets a wall-clock timeout, and each worker an address-space
+    limit where the platform supports it. A worker that hangs is killed, and
+    a worker that crashes or hits an error is replaced. Every worker is also
+    recycled after `max_tasks_per_worker` files. Results come back per file,
+    so one poison document only fails itself.
+    """
+
+    def __init__(self, workers: int = PARSER_WORKERS, timeout: float = PARSE_TIMEOUT_SECONDS,
+                 memory_limit_mb: int = PARSE_MEMORY_LIMIT_MB,
+                 max_tasks_per_worker: int = PARSER_MAX_TASKS_PER_WORKER,
+                 start_method: Optional[str] = None):
+        self.timeout = timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        # Spawn avoids forking the API process with its threads and open connections
+        context = multiprocessing.get_context(start_method or os.getenv('PARSER_START_METHOD', 'spawn'))
+        self._workers = [ParserWorker(context, memory_limit_mb) for _ in range(max(workers, 1))]
+        self._idle = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if not self._started:
+                for worker in self._workers:
+                    worker.start()
+                    self._idle.put(worker)
+                self._started = True
+
+    def parse_many(self, file_paths: List[str]) -> List[Dict]:
+        """
+        Parses files on the pool, blocking until every file has an outcome.
+
+        Args:
+            file_paths (List[str]): Paths to PDF or DOCX resumes
+
+        Returns:
+            List[Dict]: One outcome per path, in order, with `file_path`, `status`
+            ("ok", "failed" or "timeout"), `data`, the extracted `text` and `error`
+        """
+        outcomes = self._run([("file", file_path) for file_path in file_paths])
+        for outcome, file_path in zip(outcomes, file_paths):
+            outcome["file_path"] = file_path
+        return outcomes
+
+    def derive_many(self, texts: List[str]) -> List[Dict]:
+        """
+        Re-derives resume fields from already extracted text, without opening any file.
+
+        Args:
+            texts (List[str]): Extracted resume texts
+
+        Returns:
+            List[Dict]: One outcome per text, in order, with `status`, `data` and `error`
+        """
+        return self._run([("text", text) for text in texts])
+
+    def _run(self, tasks: List[tuple]) -> List[Dict]:
+        self._ensure_started()
+        outcomes = [None] * len(tasks)
+        pending = deque(enumerate(tasks))
+        busy = {}
+        send_failed = set()
+
+        def finish(index, status, data=None, text=None, error=None):
+            outcomes[index] = {"status": status, "data": data, "text": text, "error": error}
+
+        while pending or busy:
+            # Hand out work; wait for a free worker only when none of ours is running
+            while pending:
+                try:
+                    worker = self._idle.get(block=not busy)
+                except queue.Empty:
+                    break
+                index, task = pending.popleft()
+                try:
+                    worker.conn.send(task)
+                except Exception as e:
+                    # The worker's pipe is broken; replace it and retry the task once on another worker
+                    if index in send_failed:
+                        finish(index, "failed", error=f"could not send to worker: {type(e).__name__}: {str(e)}")
+                    else:
+                        send_failed.add(index)
+                        pending.appendleft((index, task))
+                    self._recycle(worker)
+                    continue
+                busy[worker.conn] = (worker, index, time.monotonic() + self.timeout)
+
+            next_deadline = min(deadline for _, _, deadline in busy.values())
+            ready = wait(list(busy), timeout=max(next_deadline - time.monotonic(), 0))
+
+            for conn in ready:
+                worker, index, _ = busy.pop(conn)
+                try:
+                    status, payload = conn.recv()
+                except (EOFError, OSError):
+                    finish(index, "failed", error=f"worker crashed (exit code {worker.process.exitcode})")
+                    worker.restart()
+                else:
+                    worker.tasks_done += 1
+                    if status == "ok":
+                        data, text = payload
+                        finish(index, "ok", data=data, text=text)
+                    else:
+                        finish(index, "failed", error=payload)
+                    if status != "ok" or worker.tasks_done >= self.max_tasks_per_worker:
+                        worker.restart()
+                self._idle.put(worker)
+
+            now = time.monotonic()
+            for conn, (worker, index, deadline) in list(busy.items()):
+                if now >= deadline:
+                    busy.pop(conn)
+                    finish(index, "timeout", error=f"parsing exceeded {self.timeout:g}s")
+                    worker.restart()
+                    self._idle.put(worker)
+
+        return outcomes
+
+    def _recycle(self, worker: ParserWorker):
+        # Always hand the worker back, even if restarting it fails, so the pool keeps its size
+        try:
+            worker.restart()
+        except Exception as e:
+            print(f"Error restarting parser worker: {str(e)}")
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        """Stop every worker."""
+        with self._lock:
+            if self._started:
+                for worker in self._workers:
+                    worker.stop()
+                self._started = False
+                self._idle = queue.Queue()
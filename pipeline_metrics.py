@@ -0,0 +1,133 @@
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional
+import bisect
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger("recruitai.metrics")
+
+# Upper bounds, in milliseconds, of the latency histogram buckets
+HISTOGRAM_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+_listeners = []
+
+def subscribe(listener: Callable[[Dict], None]):
+    """Register a callable that receives every emitted pipeline event."""
+    _listeners.append(listener)
+
+def emit(event: Dict):
+    """Send a structured event to the log and to every subscriber."""
+    logger.debug(json.dumps(event, default=str))
+    for listener in _listeners:
+        try:
+            listener(event)
+        except Exception as e:
+            print(f"Error in metrics listener: {str(e)}")
+
+class MatchTrace:
+    """
+    Per-request record of stage timings and of how each score was produced.
+
+    Stages are timed with `stage()`; anything else worth explaining (cache
+    hits, fallbacks, LLM tokens) goes through `record()`. `finish()` emits
+    the whole trace as one structured event.
+    """
+
+    def __init__(self, pipeline: str = "match"):
+        self.pipeline = pipeline
+        self.stages = {}
+        self.details = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+    def record(self, key: str, value):
+        self.details[key] = value
+
+    def to_dict(self) -> Dict:
+        return {
+            "stages_ms": {name: round(elapsed, 3) for name, elapsed in self.stages.items()},
+            "total_ms": round((time.perf_counter() - self._started) * 1000, 3),
+            **self.details
+        }
+
+    def finish(self) -> Dict:
+        trace = self.to_dict()
+        emit({"event": "pipeline_trace", "pipeline": self.pipeline, **trace})
+        return trace
+
+def timed(trace: Optional[MatchTrace], name: str):
+    """Time a stage on `trace`, or do nothing when tracing is off."""
+    return trace.stage(name) if trace is not None else nullcontext()
+
+class StageHistograms:
+    """Aggregates the stage timings of emitted traces into latency histograms."""
+
+    def __init__(self, buckets: Optional[List[float]] = None):
+        self.buckets = buckets or HISTOGRAM_BUCKETS_MS
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value_ms: float):
+        with self._lock:
+            histogram = self._histograms.setdefault(
+                name, {"counts": [0] * (len(self.buckets) + 1), "sum_ms": 0.0, "count": 0}
+            )
+            histogram["counts"][bisect.bisect_left(self.buckets, value_ms)] += 1
+            histogram["sum_ms"] += value_ms
+            histogram["count"] += 1
+
+    def __call__(self, event: Dict):
+        if event.get("event") != "pipeline_trace":
+            return
+        pipeline = event.get("pipeline", "")
+        for name, value_ms in event.get("stages_ms", {}).items():
+            self.observe(f"{pipeline}.{name}", value_ms)
+        self.observe(f"{pipeline}.total", event.get("total_ms", 0.0))
+        if event.get("llm_latency_ms") is not None:
+            self.observe(f"{pipeline}.llm", event["llm_latency_ms"])
+
+    def snapshot(self) -> Dict:
+        """Return cumulative bucket counts per stage, Prometheus style."""
+        with self._lock:
+            snapshot = {}
+            for name, histogram in self._histograms.items():
+                cumulative, buckets = 0, {}
+                for bound, count in zip(self.buckets + ["+Inf"], histogram["counts"]):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                snapshot[name] = {"buckets": buckets, "sum_ms": round(histogram["sum_ms"], 3), "count": histogram["count"]}
+            return snapshot
+
+class PathCounters:
+    """Counts traces by the `path` they record, e.g. which JD summarizer answered."""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Dict):
+        if event.get("event") != "pipeline_trace" or "path" not in event:
+            return
+        name = f"{event.get('pipeline', '')}.{event['path']}"
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return dict(self._counts)
+
+# Default in-process aggregation, served by the API
+stage_histograms = StageHistograms()
+path_counters = PathCounters()
+subscribe(stage_histograms)
+subscribe(path_counters)
@@ -0,0 +1,211 @@
+from typing import Callable, Dict, List, Optional
+import os
+import threading
+import time
+from sqlalchemy import or_
+from database.models import Resume, SkillPosting
+from file_storage import stored_file_path
+from file_uploads import content_hash
+from parser_workers import ParserPool
+from resume_parser import PARSER_VERSION, TEXT_EXTRACTION_VERSION
+from skill_index import normalize_skills, skill_index
+from skill_taxonomy import get_taxonomy
+from text_store import get_text_store
+
+BACKFILL_BATCH_SIZE = int(os.getenv('BACKFILL_BATCH_SIZE', 50))
+BACKFILL_RATE_PER_SECOND = float(os.getenv('BACKFILL_RATE_PER_SECOND', 20))
+BACKFILL_WORKERS = int(os.getenv('BACKFILL_WORKERS', 1))
+
+class ResumeBackfill:
+    """
+    Re-derives the fields of resumes parsed by an older PARSER_VERSION.
+
+    Runs in a background thread with its own small parser pool, so uploads
+    keep the main pool to themselves. Rows are processed in id order, in
+    batches, at no more than `rate` rows per second. Fields come from the
+    text store when the file's text is cached by the current
+    TEXT_EXTRACTION_VERSION and from the stored file otherwise; rows whose
+    only text is stale and whose file is gone are skipped. Each batch
+    commits with the new parser version, so a stopped or crashed run picks
+    up where it left off the next time it starts. Rows saved before uploads
+    were hashed get the content hash of their file, unless another row
+    already has it. `on_complete` is called after a run that finished.
+    """
+
+    def __init__(self, session_factory: Callable, batch_size: int = BACKFILL_BATCH_SIZE,
+                 rate: float = BACKFILL_RATE_PER_SECOND, workers: int = BACKFILL_WORKERS,
+                 on_complete: Optional[Callable[[], None]] = None):
+        self.session_factory = session_factory
+        self.on_complete = on_complete
+        self.batch_size = max(batch_size, 1)
+        self.rate = rate
+        self.workers = workers
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._progress = self._new_progress(0)
+        self._progress["state"] = "idle"
+
+    @staticmethod
+    def _new_progress(total: int) -> Dict:
+        return {
+            "state": "running",
+            "parser_version": PARSER_VERSION,
+            "total": total,
+            "processed": 0,
+            "updated": 0,
+            "from_text_store": 0,
+            "from_file": 0,
+            "skipped": 0,
+            "failed": 0,
+            "last_id": 0,
+            "started_at": time.time(),
+            "finished_at": None,
+            "error": None
+        }
+
+    def start(self) -> bool:
+        """Start a run in the background; returns False if one is already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="resume-backfill", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self, timeout: Optional[float] = None):
+        """Ask the running batch loop to stop after the current batch and wait for it."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> Dict:
+        """Return a snapshot of the progress counters, with throughput and a remaining-time estimate."""
+        with self._lock:
+            progress = dict(self._progress)
+        elapsed = (progress["finished_at"] or time.time()) - progress["started_at"]
+        progress["rows_per_second"] = round(progress["processed"] / elapsed, 2) if elapsed > 0 else 0.0
+        remaining = max(progress["total"] - progress["processed"], 0)
+        progress["eta_seconds"] = (
+            round(remaining / progress["rows_per_second"], 1) if progress["rows_per_second"] else None
+        )
+        return progress
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._progress[key] += amount
+
+    def _outdated(self, db):
+        return db.query(Resume).filter(
+            or_(Resume.parser_version.is_(None), Resume.parser_version < PARSER_VERSION)
+        )
+
+    def _run(self):
+        db = self.session_factory()
+        pool = ParserPool(workers=self.workers)
+        try:
+            with self._lock:
+                self._progress = self._new_progress(self._outdated(db).count())
+            cursor = 0
+            while not self._stop.is_set():
+                batch_started = time.monotonic()
+                rows = self._outdated(db).filter(Resume.id > cursor).order_by(Resume.id).limit(self.batch_size).all()
+                if not rows:
+                    break
+                self._process_batch(db, pool, rows)
+                cursor = rows[-1].id
+                with self._lock:
+                    self._progress["last_id"] = cursor
+
+                # Stay under the row rate; waiting on the stop event keeps shutdown prompt
+                if self.rate > 0:
+                    self._stop.wait(max(len(rows) / self.rate - (time.monotonic() - batch_started), 0))
+            final_state = "stopped" if self._stop.is_set() else "completed"
+        except Exception as e:
+            db.rollback()
+            print(f"Error in resume backfill: {str(e)}")
+            final_state = "failed"
+            with self._lock:
+                self._progress["error"] = str(e)
+        finally:
+            pool.close()
+            db.close()
+        with self._lock:
+            self._progress["state"] = final_state
+            self._progress["finished_at"] = time.time()
+        if final_state == "completed" and self.on_complete is not None:
+            try:
+                self.on_complete()
+            except Exception as e:
+                print(f"Error after resume backfill: {str(e)}")
+
+    @staticmethod
+    def _assign_content_hash(db, row, file_path: str):
+        with open(file_path, "rb") as file:
+            digest = content_hash(file.read())
+        # Hashes are unique; a duplicate older row keeps none rather than block the unique index
+        with db.no_autoflush:
+            taken = db.query(Resume.id).filter(Resume.content_hash == digest, Resume.id != row.id).first()
+        pending = any(other.content_hash == digest for other in db.dirty if isinstance(other, Resume))
+        if taken is None and not pending:
+            row.content_hash = digest
+
+    def _process_batch(self, db, pool: ParserPool, rows: List):
+        text_store = get_text_store()
+        texts, text_rows, file_rows, file_paths = [], [], [], []
+        for row in rows:
+            record = text_store.get(row.content_hash) if row.content_hash else None
+            if record is not None and record.text_version < TEXT_EXTRACTION_VERSION:
+                # Text extraction changed since this text was stored; read the file again
+                record = None
+            file_path = stored_file_path(row.file_path) if record is None else None
+            if record is not None:
+                texts.append(record.text)
+                text_rows.append(row)
+            elif file_path is not None:
+                if not row.content_hash:
+                    self._assign_content_hash(db, row, file_path)
+                file_rows.append(row)
+                file_paths.append(file_path)
+            else:
+                self._count("skipped")
+
+        results = list(zip(text_rows, pool.derive_many(texts))) if texts else []
+        self._count("from_text_store", len(text_rows))
+        if file_rows:
+            file_outcomes = pool.parse_many(file_paths)
+            for row, outcome in zip(file_rows, file_outcomes):
+                if outcome["status"] == "ok" and row.content_hash:
+                    text_store.put(row.content_hash, outcome["text"] or "", TEXT_EXTRACTION_VERSION)
+            results += list(zip(file_rows, file_outcomes))
+            self._count("from_file", len(file_rows))
+
+        reindex = []
+        taxonomy = get_taxonomy()
+        for row, outcome in results:
+            if outcome["status"] != "ok":
+                self._count("failed")
+                continue
+            data = outcome["data"]
+            old_skills = [skill.strip() for skill in (row.skills or "").split(",") if skill.strip()]
+            row.name = data.get("name") or row.name
+            row.email = data.get("email") or row.email
+            row.skills = ", ".join(data.get("skills", []))
+            row.experience = data.get("experience", "")
+            row.experience_signature = data.get("experience_signature")
+            row.skill_set = taxonomy.pack(taxonomy.skill_set(data.get("skills", [])))
+            row.education = data.get("education", "")
+            row.parser_version = PARSER_VERSION
+            row.skills_indexed = True
+
+            db.query(SkillPosting).filter(SkillPosting.candidate_id == row.id).delete(synchronize_session=False)
+            for skill in normalize_skills(data.get("skills", [])):
+                db.add(SkillPosting(skill=skill, candidate_id=row.id))
+            reindex.append((row.id, old_skills, data.get("skills", [])))
+        db.commit()
+
+        for candidate_id, old_skills, new_skills in reindex:
+            skill_index.replace(candidate_id, old_skills, new_skills)
+        self._count("updated", len(reindex))
+        self._count("processed", len(rows))
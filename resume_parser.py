@@ -1,18 +1,76 @@
-from typing import Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from itertools import islice
+import os
 import PyPDF2
 import docx2txt
 import re
 from pathlib import Path
+from text_sketch import minhash_signature
+from skill_extractor import get_skill_extractor
+from skill_taxonomy import get_taxonomy
+from resume_sections import Section, section_text, segment_sections
+
+# Optional cap on the pages of a PDF resume read at ingest; unset reads every page
+RESUME_MAX_PAGES = int(os.environ['RESUME_MAX_PAGES']) if os.getenv('RESUME_MAX_PAGES') else None
+
+# Bump whenever text or field extraction changes, so stored resumes can be re-derived
+PARSER_VERSION = 2
+# Bump (along with PARSER_VERSION) only when extracting text from the file changes;
+# stored text from an older version is re-extracted instead of reused
+TEXT_EXTRACTION_VERSION = 1
+
+def iter_pdf_pages(file_path: str, max_pages: Optional[int] = None) -> Iterator[str]:
+    """Yield the text of each PDF page, extracting a page only when it is requested."""
+    reader = PyPDF2.PdfReader(file_path)
+    for page in islice(reader.pages, max_pages):
+        yield page.extract_text() or ""
+
+class ResumeDocument:
+    """
+    Extracted resume text, kept per page.
+
+    Header fields read `first_page`; the field extractors read `text`.
+    """
+
+    def __init__(self, pages: Iterable[str]):
+        self.pages = list(pages)
+        self.text = "\n".join(self.pages)
+
+    @property
+    def first_page(self) -> str:
+        return self.pages[0] if self.pages else ""
+
+def open_resume(file_path: str, max_pages: Optional[int] = None) -> ResumeDocument:
+    """
+    Extract a PDF or DOCX resume, raising on unsupported or unreadable files.
+
+    Args:
+        file_path (str): Path to the resume file
+        max_pages (Optional[int]): Pages of a PDF to read; None uses RESUME_MAX_PAGES,
+            which reads every page unless configured
+
+    Returns:
+        ResumeDocument: The extracted pages
+    """
+    if max_pages is None:
+        max_pages = RESUME_MAX_PAGES
+    file_extension = Path(file_path).suffix.lower()
+    if file_extension == '.pdf':
+        return ResumeDocument(iter_pdf_pages(file_path, max_pages))
+    elif file_extension == '.docx':
+        # DOCX has no page structure; the whole document is one "page"
+        return ResumeDocument([docx2txt.process(file_path)])
+    else:
+        raise ValueError("Unsupported file format. Please provide PDF or DOCX.")
+
+def read_pdf_text(file_path: str, max_pages: Optional[int] = None) -> str:
+    """Extract text from PDF file, every page unless `max_pages` is given, raising on unreadable files."""
+    return "\n".join(iter_pdf_pages(file_path, max_pages))
 
 def extract_text_from_pdf(file_path: str) -> str:
     """Extract text from PDF file."""
     try:
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
-            return text
+        return read_pdf_text(file_path)
     except Exception as e:
         print(f"Error reading PDF: {str(e)}")
         return ""
@@ -25,6 +83,10 @@ def extract_text_from_docx(file_path: str) -> str:
         print(f"Error reading DOCX: {str(e)}")
         return ""
 
+def read_resume_text(file_path: str) -> str:
+    """Extract text from a PDF or DOCX resume, raising on unsupported or unreadable files."""
+    return open_resume(file_path).text
+
 def extract_email(text: str) -> str:
     """Extract email address from text."""
     email_pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
@@ -41,33 +103,70 @@ def extract_name(text: str) -> str:
     return ""
 
 def extract_education(text: str) -> str:
-    """Extract education information from text."""
+    """Extract education information from text without an education section."""
     education_keywords = ['education', 'academic', 'degree', 'university', 'college', 'bachelor', 'master', 'phd']
     lines = text.split('\n')
     education = []
-    
+    next_line = 0
+
     for i, line in enumerate(lines):
         if any(keyword in line.lower() for keyword in education_keywords):
-            # Include the current line and next few lines
-            education.extend(lines[i:i+5])
-    
+            # Include the current line and next few lines, skipping lines already taken
+            education.extend(lines[max(i, next_line):i+5])
+            next_line = max(next_line, i + 5)
+
     return '\n'.join(education)
 
-def extract_skills(text: str) -> list:
-    """Extract skills from text."""
-    # Common technical skills to look for
-    common_skills = [
-        'python', 'java', 'javascript', 'sql', 'html', 'css', 'react', 'angular',
-        'node.js', 'aws', 'azure', 'docker', 'kubernetes', 'git', 'linux',
-        'machine learning', 'data analysis', 'project management'
-    ]
-    
-    found_skills = []
-    for skill in common_skills:
-        if skill in text.lower():
-            found_skills.append(skill)
-    
-    return found_skills
+def extract_skills(text: str, sections: Optional[List[Section]] = None) -> list:
+    """
+    Extract canonical taxonomy skills from text, in order of first mention.
+
+    Ambiguous skill names ("spring", "rest") are taken from the skills
+    sections in `sections`, and elsewhere only when listed with other skills.
+    """
+    taxonomy = get_taxonomy()
+    skills_spans = [(section.start, section.end) for section in sections or [] if section.name == "skills"]
+    return [taxonomy.name(skill_id) for skill_id in get_skill_extractor().extract(text, skills_spans)]
+
+def extract_header(document: ResumeDocument) -> Dict:
+    """Extract name and email, reading past the first page only if the email is not on it."""
+    return {
+        "name": extract_name(document.first_page),
+        "email": extract_email(document.first_page) or extract_email(document.text)
+    }
+
+def extract_resume_fields(document: ResumeDocument) -> Dict:
+    """
+    Extract structured resume fields from a resume document.
+
+    Plain text can be wrapped as `ResumeDocument([text])`.
+    """
+    header = extract_header(document)
+    text = document.text
+    sections = segment_sections(text)
+    # Resumes without recognizable headers keep the full text as experience
+    experience = section_text(text, sections, "experience") or text
+    return {
+        "name": header["name"],
+        "email": header["email"],
+        "education": section_text(text, sections, "education") or extract_education(text),
+        "skills": extract_skills(text, sections),
+        "experience": experience,
+        "experience_signature": minhash_signature(experience)
+    }
+
+def derive_resume_fields(text: str) -> Dict:
+    """Re-derive resume fields from previously extracted text, e.g. from the text store."""
+    return extract_resume_fields(ResumeDocument([text]))
+
+def parse_resume_file(file_path: str) -> Dict:
+    """Like `parse_resume`, but raises instead of returning empty fields."""
+    return extract_resume_fields(open_resume(file_path))
+
+def parse_resume_file_with_text(file_path: str) -> Tuple[Dict, str]:
+    """Like `parse_resume_file`, also returning the extracted text for the text store."""
+    document = open_resume(file_path)
+    return extract_resume_fields(document), document.text
 
 def parse_resume(file_path: str) -> Dict:
     """
@@ -80,23 +179,7 @@ def parse_resume(file_path: str) -> Dict:
         Dict: Structured resume data containing name, email, education, skills, and experience
     """
     try:
-        # Determine file type and extract text
-        file_extension = Path(file_path).suffix.lower()
-        if file_extension == '.pdf':
-            text = extract_text_from_pdf(file_path)
-        elif file_extension == '.docx':
-            text = extract_text_from_docx(file_path)
-        else:
-            raise ValueError("Unsupported file format. Please provide PDF or DOCX.")
-        
-        # Extract information
-        return {
-            "name": extract_name(text),
-            "email": extract_email(text),
-            "education": extract_education(text),
-            "skills": extract_skills(text),
-            "experience": text  # For now, return full text as experience
-        }
+        return parse_resume_file(file_path)
         
     except Exception as e:
         print(f"Error parsing resume: {str(e)}")
@@ -105,5 +188,6 @@ def parse_resume(file_path: str) -> Dict:
             "email": "",
             "education": "",
             "skills": [],
-            "experience": ""
-        } 
\ No newline at end of file
+            "experience": "",
+            "experience_signature": b""
+        }
@@ -0,0 +1,74 @@
+from typing import List, NamedTuple
+
+# Header spellings per section, compared after stripping punctuation and lowercasing
+SECTION_HEADERS = {
+    "summary": ["summary", "professional summary", "profile", "about me", "objective", "career objective"],
+    "experience": [
+        "experience", "work experience", "professional experience", "employment", "employment history",
+        "work history", "career history", "relevant experience"
+    ],
+    "education": ["education", "academic background", "academics", "education and training", "qualifications"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies", "tech stack"],
+    "projects": ["projects", "personal projects", "key projects", "academic projects"],
+    "certifications": ["certifications", "certificates", "licenses and certifications"],
+    "awards": ["awards", "honors", "achievements", "honors and awards"],
+    "publications": ["publications"],
+    "languages": ["languages"],
+    "interests": ["interests", "hobbies"],
+    "references": ["references"]
+}
+
+_HEADER_LOOKUP = {header: section for section, headers in SECTION_HEADERS.items() for header in headers}
+_MAX_HEADER_LENGTH = max(len(header) for header in _HEADER_LOOKUP) + 8
+_HEADER_PUNCTUATION = " \t\r:-–—•*#|_=."
+
+class Section(NamedTuple):
+    """A section body as offsets into the resume text; the header line itself is excluded."""
+    name: str
+    start: int
+    end: int
+
+def _header_name(line: str) -> str:
+    normalized = " ".join(line.strip(_HEADER_PUNCTUATION).lower().replace("&", "and").split())
+    return _HEADER_LOOKUP.get(normalized, "")
+
+def segment_sections(text: str) -> List[Section]:
+    """
+    Splits resume text into sections in one pass over its lines.
+
+    A section header is a short line that, once punctuation and case are
+    ignored, is one of the spellings in `SECTION_HEADERS`. Only header
+    candidates are copied; section bodies are returned as offsets.
+
+    Args:
+        text (str): Full resume text
+
+    Returns:
+        List[Section]: Sections in document order. Text before the first header
+        is not part of any section.
+    """
+    sections = []
+    current_name, current_start = None, 0
+    line_start = 0
+    length = len(text)
+
+    while line_start <= length:
+        line_end = text.find("\n", line_start)
+        if line_end == -1:
+            line_end = length
+        if line_end - line_start <= _MAX_HEADER_LENGTH:
+            name = _header_name(text[line_start:line_end])
+            if name:
+                if current_name is not None:
+                    sections.append(Section(current_name, current_start, line_start))
+                current_name, current_start = name, min(line_end + 1, length)
+        line_start = line_end + 1
+
+    if current_name is not None:
+        sections.append(Section(current_name, current_start, length))
+    return sections
+
+def section_text(text: str, sections: List[Section], name: str) -> str:
+    """Return the stripped bodies of every section called `name`, joined by blank lines."""
+    bodies = (text[section.start:section.end].strip() for section in sections if section.name == name)
+    return "\n\n".join(body for body in bodies if body)
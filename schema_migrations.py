@@ -0,0 +1,75 @@
+from typing import Iterable, List
+from sqlalchemy import Table
+
+def _column_names(conn, table: Table) -> set:
+    return {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table.name}")')}
+
+def _index_names(conn, table: Table) -> set:
+    return {row[1] for row in conn.exec_driver_sql(f'PRAGMA index_list("{table.name}")')}
+
+def add_missing_columns(engine, tables: Iterable[Table]) -> List[str]:
+    """
+    Adds model columns that an existing table lacks.
+
+    `create_all` only creates missing tables and never alters existing
+    ones, so databases created before a column was introduced need it
+    added. Existing rows get NULL, which the code treats like a row that
+    predates the column. Safe to run at every startup.
+
+    Args:
+        engine: SQLAlchemy engine of a SQLite database
+        tables (Iterable[Table]): Model tables to bring up to date
+
+    Returns:
+        List[str]: "table.column" for each column added
+    """
+    added = []
+    with engine.begin() as conn:
+        for table in tables:
+            existing = _column_names(conn, table)
+            if not existing:
+                continue  # Not created yet; create_all makes it with every column
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}')
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+def create_missing_indexes(engine, tables: Iterable[Table], unique: bool = False) -> List[str]:
+    """
+    Creates model indexes that an existing table lacks.
+
+    Non-unique indexes are created by default. With `unique=True` only
+    unique indexes are created, and one is skipped while its columns hold
+    duplicate values, e.g. content hashes filled in for older rows by a
+    backfill; it is created by a later call once the duplicates are gone.
+
+    Args:
+        engine: SQLAlchemy engine of a SQLite database
+        tables (Iterable[Table]): Model tables to bring up to date
+        unique (bool): Create the unique indexes instead of the non-unique ones
+
+    Returns:
+        List[str]: Names of the indexes created
+    """
+    created = []
+    with engine.begin() as conn:
+        for table in tables:
+            existing = _index_names(conn, table)
+            for index in table.indexes:
+                if bool(index.unique) != unique or index.name in existing:
+                    continue
+                if unique:
+                    columns = ", ".join(f'"{column.name}"' for column in index.columns)
+                    not_null = " AND ".join(f'"{column.name}" IS NOT NULL' for column in index.columns)
+                    duplicate = conn.exec_driver_sql(
+                        f'SELECT 1 FROM "{table.name}" WHERE {not_null} GROUP BY {columns} HAVING COUNT(*) > 1 LIMIT 1'
+                    ).first()
+                    if duplicate is not None:
+                        print(f"Error creating unique index {index.name}: {table.name} has duplicate values")
+                        continue
+                index.create(conn)
+                created.append(index.name)
+    return created
@@ -0,0 +1,146 @@
+from typing import Dict, Iterable, Iterator, List, Tuple
+import re
+import threading
+from skill_taxonomy import get_taxonomy
+
+# Text between two items of a skill list: punctuation or bullets, optionally with "and"/"or"
+_LIST_SEPARATOR = re.compile(r"\s*(?:[,/|;&•·()+]\s*)+(?:(?:and|or)\s+)?|\s+(?:and|or)\s+")
+
+_WHITESPACE = str.maketrans({"\n": " ", "\r": " ", "\t": " ", "\f": " ", "\v": " "})
+
+class AhoCorasick:
+    """
+    Multi-pattern string matcher that finds every pattern in one scan.
+
+    Patterns are compiled into a trie with failure links, so scanning costs
+    time proportional to the text length plus the number of matches, no
+    matter how many patterns there are.
+    """
+
+    def __init__(self, patterns: Dict[str, int]):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for pattern, value in patterns.items():
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append((len(pattern), value))
+
+        # Breadth-first pass to link each node to its longest proper suffix in the trie
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0) if node else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield (start, end, value) for every pattern occurrence in `text`."""
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, value in output[node]:
+                yield index - length + 1, index + 1, value
+
+def _is_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not text[index].isalnum()
+
+def _in_spans(start: int, end: int, spans: List[Tuple[int, int]]) -> bool:
+    return any(span_start <= start and end <= span_end for span_start, span_end in spans)
+
+class SkillExtractor:
+    """
+    Finds taxonomy skills and their aliases in resume text in a single pass.
+
+    Ambiguous names, ordinary words such as "spring" or "rest" that are also
+    skills, are only kept inside a trusted span (a skills section) or when
+    they sit in a list next to another kept skill, as in "Java, Spring".
+    """
+
+    def __init__(self, patterns: Dict[str, int], ambiguous: Iterable[str] = ()):
+        ambiguous = set(ambiguous)
+        self._automaton = AhoCorasick({
+            pattern: (skill_id, pattern in ambiguous) for pattern, skill_id in patterns.items()
+        })
+
+    def find(self, text: str, trusted_spans: Iterable[Tuple[int, int]] = ()) -> List[Tuple[int, int, int]]:
+        """
+        Finds whole-word skill mentions.
+
+        Args:
+            text (str): Resume or job description text
+            trusted_spans (Iterable[Tuple[int, int]]): (start, end) offsets of text that
+                lists skills, such as a skills section, where ambiguous names are kept
+
+        Returns:
+            List[Tuple[int, int, int]]: (skill_id, start, end) per mention, in text order.
+            Offsets index the lowercased text. Overlapping mentions keep the longest,
+            so "c++" is not also reported as "c" and "rest api" not as "rest".
+        """
+        # Whitespace of any kind matches the single spaces in multi-word skills
+        normalized = text.lower().translate(_WHITESPACE)
+        candidates = [
+            (start, end, value)
+            for start, end, value in self._automaton.iter_matches(normalized)
+            if _is_boundary(normalized, start - 1) and _is_boundary(normalized, end)
+        ]
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+
+        mentions = []
+        covered_until = 0
+        for start, end, value in candidates:
+            if start >= covered_until:
+                mentions.append((start, end, value))
+                covered_until = end
+
+        spans = list(trusted_spans)
+        kept = [not ambiguous or _in_spans(start, end, spans) for start, end, (_, ambiguous) in mentions]
+        # An ambiguous mention listed next to a kept one is kept too, until nothing changes
+        changed = True
+        while changed:
+            changed = False
+            for index in range(len(mentions)):
+                if kept[index]:
+                    continue
+                start, end, _ = mentions[index]
+                if (index > 0 and kept[index - 1]
+                        and _LIST_SEPARATOR.fullmatch(normalized, mentions[index - 1][1], start)) \
+                        or (index + 1 < len(mentions) and kept[index + 1]
+                            and _LIST_SEPARATOR.fullmatch(normalized, end, mentions[index + 1][0])):
+                    kept[index] = changed = True
+
+        return [
+            (skill_id, start, end)
+            for (start, end, (skill_id, _)), keep in zip(mentions, kept) if keep
+        ]
+
+    def extract(self, text: str, trusted_spans: Iterable[Tuple[int, int]] = ()) -> List[int]:
+        """Return the distinct skill ids mentioned in `text`, in order of first mention."""
+        return list(dict.fromkeys(skill_id for skill_id, _, _ in self.find(text, trusted_spans)))
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+def get_skill_extractor() -> SkillExtractor:
+    """Return the shared extractor, building the automaton from the taxonomy on first use."""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            taxonomy = get_taxonomy()
+            _extractor = SkillExtractor(taxonomy.aliases(), taxonomy.ambiguous())
+        return _extractor
@@ -0,0 +1,143 @@
+from array import array
+from typing import Iterable, List, Optional, Tuple
+import threading
+import numpy as np
+from skill_taxonomy import get_taxonomy
+
+def normalize_skill(skill: str) -> str:
+    """Map a skill to its canonical taxonomy name for indexing and lookup."""
+    return get_taxonomy().canonical(skill)
+
+def normalize_skills(skills: Iterable[str]) -> List[str]:
+    """Return the distinct canonical names of a skill list, in order."""
+    return list(dict.fromkeys(normalize_skill(skill) for skill in skills if skill and skill.strip()))
+
+class SkillIndex:
+    """
+    In-memory inverted index from normalized skill to candidate ids.
+
+    Posting lists are append-only int64 arrays so a query can hand them to
+    NumPy without copying them element by element. Removing a candidate from
+    a skill records a tombstone that queries filter out; a posting list is
+    compacted once half of it is tombstones. The index is rebuilt from the
+    skill_postings table at startup and kept current as resumes arrive.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._removed = {}
+        self._lock = threading.Lock()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, candidate_id: int, skills: Iterable[str]) -> List[str]:
+        """
+        Adds a candidate to the posting list of each of their skills.
+
+        Args:
+            candidate_id (int): Resume id
+            skills (Iterable[str]): Skills found on the resume
+
+        Returns:
+            List[str]: The distinct normalized skills that were indexed
+        """
+        normalized = normalize_skills(skills)
+        with self._lock:
+            for skill in normalized:
+                self._postings.setdefault(skill, array('q')).append(candidate_id)
+            self._size += 1
+        return normalized
+
+    def replace(self, candidate_id: int, old_skills: Iterable[str], new_skills: Iterable[str]) -> List[str]:
+        """
+        Re-indexes a candidate whose skills changed, e.g. after a re-parse.
+
+        Args:
+            candidate_id (int): Resume id
+            old_skills (Iterable[str]): Skills the candidate is currently indexed under
+            new_skills (Iterable[str]): Skills found by the latest parse
+
+        Returns:
+            List[str]: The distinct normalized new skills
+        """
+        old = set(normalize_skills(old_skills))
+        new = normalize_skills(new_skills)
+        with self._lock:
+            for skill in old.difference(new):
+                if skill in self._postings:
+                    removed = self._removed.setdefault(skill, set())
+                    removed.add(candidate_id)
+                    if len(removed) * 2 >= len(self._postings[skill]):
+                        self._compact(skill)
+            for skill in new:
+                if skill in old:
+                    continue
+                removed = self._removed.get(skill)
+                if removed is not None and candidate_id in removed:
+                    # The old entry is still in the posting list; dropping the tombstone restores it
+                    removed.discard(candidate_id)
+                else:
+                    self._postings.setdefault(skill, array('q')).append(candidate_id)
+        return new
+
+    def _compact(self, skill: str):
+        # Caller holds the lock
+        removed = self._removed.pop(skill)
+        posting = np.frombuffer(self._postings[skill], dtype=np.int64)
+        kept = posting[~np.isin(posting, np.fromiter(removed, dtype=np.int64, count=len(removed)))]
+        self._postings[skill] = array('q', kept.tobytes())
+
+    def _live_posting(self, skill: str) -> np.ndarray:
+        # Caller holds the lock; returns a copy when tombstones have to be filtered out
+        posting = np.frombuffer(self._postings[skill], dtype=np.int64)
+        removed = self._removed.get(skill)
+        if removed:
+            posting = posting[~np.isin(posting, np.fromiter(removed, dtype=np.int64, count=len(removed)))]
+        return posting
+
+    def load(self, postings: Iterable[Tuple[str, int]]):
+        """Bulk-load (skill, candidate_id) pairs, e.g. from the skill_postings table."""
+        candidates = set()
+        with self._lock:
+            for skill, candidate_id in postings:
+                self._postings.setdefault(skill, array('q')).append(candidate_id)
+                candidates.add(candidate_id)
+            self._size += len(candidates)
+
+    def candidates_for(self, skills: Iterable[str], min_shared: int = 1, limit: Optional[int] = None) -> Tuple[int, List[Tuple[int, int]]]:
+        """
+        Finds candidates sharing at least `min_shared` of the given skills.
+
+        Args:
+            skills (Iterable[str]): Skills required by the job
+            min_shared (int): Minimum number of shared skills
+            limit (Optional[int]): Maximum number of candidates to return
+
+        Returns:
+            Tuple[int, List[Tuple[int, int]]]: Total number of matching candidates, and
+            (candidate_id, shared_skill_count) pairs with the most shared skills first
+        """
+        required = set(normalize_skill(skill) for skill in skills if skill and skill.strip())
+        min_shared = max(min_shared, 1)
+        if len(required) < min_shared:
+            return 0, []
+
+        with self._lock:
+            present = [skill for skill in required if skill in self._postings]
+            if len(present) < min_shared:
+                return 0, []
+            ids = np.concatenate([self._live_posting(skill) for skill in present])
+
+        # Sized by the number of distinct ids rather than the largest id
+        unique_ids, counts = np.unique(ids, return_counts=True)
+        keep = counts >= min_shared
+        matched, shared = unique_ids[keep], counts[keep]
+        order = np.argsort(-shared, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return len(matched), list(zip(matched[order].tolist(), shared[order].tolist()))
+
+# Shared index used by the API
+skill_index = SkillIndex()
@@ -0,0 +1,180 @@
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+import csv
+import os
+import threading
+import zlib
+
+# One canonical skill per row with "|"-separated aliases. The "ambiguous" column
+# lists the row's names that are also common words ("spring", "rest", "hr"), so
+# they are only taken from free text in context. Ids follow row order, so only
+# append new rows to keep ids stable.
+TAXONOMY_PATH = os.getenv(
+    'SKILL_TAXONOMY_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.csv')
+)
+
+def normalize_skill(skill: str) -> str:
+    """Normalize a skill name for lookup."""
+    return " ".join(skill.lower().split())
+
+class SkillSet(NamedTuple):
+    """
+    A skill list encoded against the taxonomy.
+
+    `bits` has bit `i` set when the skill with id `i` is present. Skills
+    missing from the data file have no id and are kept by normalized name
+    in `unknown`, so they still match each other.
+    """
+    bits: int
+    unknown: FrozenSet[str]
+
+    @property
+    def size(self) -> int:
+        return self.bits.bit_count() + len(self.unknown)
+
+    def overlap(self, other: "SkillSet") -> int:
+        """Number of distinct canonical skills present in both sets."""
+        return (self.bits & other.bits).bit_count() + len(self.unknown & other.unknown)
+
+class SkillTaxonomy:
+    """
+    Canonical skills, their aliases and integer ids.
+
+    Every skill name or alias in the data file maps to the id of its canonical
+    skill. Ids are fixed by the data file: lookups never add entries, so free
+    text seen while matching cannot grow the table. Skill lists are encoded
+    once, at ingest, as a `SkillSet` and stored with `pack`.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or TAXONOMY_PATH
+        self._names = []
+        self._lookup = {}
+        self._ambiguous = set()
+        self.fingerprint = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        # Loaded on first use so importing the matcher stays cheap
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                with open(self.path, 'rb') as file:
+                    # Packed skill sets are only valid for the data file they were encoded with
+                    self.fingerprint = zlib.crc32(file.read())
+                with open(self.path, newline='', encoding='utf-8') as file:
+                    for row in csv.DictReader(file):
+                        skill = normalize_skill(row['skill'])
+                        if not skill or skill in self._lookup:
+                            continue
+                        skill_id = len(self._names)
+                        self._names.append(skill)
+                        self._lookup[skill] = skill_id
+                        for alias in (row.get('aliases') or '').split('|'):
+                            alias = normalize_skill(alias)
+                            if alias:
+                                self._lookup.setdefault(alias, skill_id)
+                        for name in (row.get('ambiguous') or '').split('|'):
+                            name = normalize_skill(name)
+                            if name:
+                                self._ambiguous.add(name)
+            except OSError as e:
+                print(f"Error loading skill taxonomy: {str(e)}")
+            self._loaded = True
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._names)
+
+    def find_id(self, skill: str) -> Optional[int]:
+        """Return the id of a skill's canonical form, or None if it is not in the taxonomy."""
+        self._ensure_loaded()
+        return self._lookup.get(normalize_skill(skill))
+
+    def name(self, skill_id: int) -> str:
+        """Return the canonical name for an id."""
+        self._ensure_loaded()
+        return self._names[skill_id]
+
+    def canonical(self, skill: str) -> str:
+        """Return the canonical name of a skill or alias; unknown skills are only normalized."""
+        skill_id = self.find_id(skill)
+        return self._names[skill_id] if skill_id is not None else normalize_skill(skill)
+
+    def ids(self, skills: Iterable[str]) -> List[int]:
+        """Return the sorted distinct ids of the known skills in a list."""
+        return sorted(set(
+            skill_id for skill_id in (self.find_id(skill) for skill in skills if skill and skill.strip())
+            if skill_id is not None
+        ))
+
+    def encode(self, skills: Iterable[str]) -> int:
+        """Return the bitset of the known skills in a list."""
+        return self.skill_set(skills).bits
+
+    def skill_set(self, skills: Iterable[str]) -> SkillSet:
+        """Encode a skill list: known skills as bits, the rest by normalized name."""
+        bits, unknown = 0, set()
+        for skill in skills:
+            if not skill or not skill.strip():
+                continue
+            skill_id = self.find_id(skill)
+            if skill_id is None:
+                unknown.add(normalize_skill(skill))
+            else:
+                bits |= 1 << skill_id
+        return SkillSet(bits, frozenset(unknown))
+
+    def pack(self, skill_set: SkillSet) -> bytes:
+        """
+        Serialize a skill set for storage on a row.
+
+        The layout is the taxonomy fingerprint (4 bytes), the bitset length
+        (2 bytes), the bitset, then the unknown names separated by newlines.
+        """
+        self._ensure_loaded()
+        bits = skill_set.bits.to_bytes((skill_set.bits.bit_length() + 7) // 8, 'big')
+        unknown = "\n".join(sorted(skill_set.unknown)).encode('utf-8')
+        return self.fingerprint.to_bytes(4, 'big') + len(bits).to_bytes(2, 'big') + bits + unknown
+
+    def unpack(self, packed: Optional[bytes]) -> Optional[SkillSet]:
+        """Read a packed skill set, or return None if it is missing or was encoded with another data file."""
+        self._ensure_loaded()
+        if not packed or len(packed) < 6 or int.from_bytes(packed[:4], 'big') != self.fingerprint:
+            return None
+        length = int.from_bytes(packed[4:6], 'big')
+        bits = int.from_bytes(packed[6:6 + length], 'big')
+        unknown = packed[6 + length:].decode('utf-8')
+        return SkillSet(bits, frozenset(unknown.split("\n")) if unknown else frozenset())
+
+    def decode(self, bitset: int) -> List[str]:
+        """Return the canonical skill names in a bitset, by id."""
+        self._ensure_loaded()
+        names = []
+        skill_id = 0
+        while bitset:
+            if bitset & 1:
+                names.append(self._names[skill_id])
+            bitset >>= 1
+            skill_id += 1
+        return names
+
+    def aliases(self) -> Dict[str, int]:
+        """Return every name and alias from the data file with its canonical id."""
+        self._ensure_loaded()
+        return dict(self._lookup)
+
+    def ambiguous(self) -> FrozenSet[str]:
+        """Return the names and aliases that are also ordinary words and need context in free text."""
+        self._ensure_loaded()
+        return frozenset(self._ambiguous)
+
+_taxonomy = SkillTaxonomy()
+
+def get_taxonomy() -> SkillTaxonomy:
+    """Return the shared skill taxonomy."""
+    return _taxonomy
@@ -0,0 +1,114 @@
+from typing import Optional
+import re
+
+class JSONObjectParser:
+    """
+    Incrementally tracks a streamed JSON object and reports when it is complete.
+
+    Feed generation chunks with `feed`; it returns True once the top-level
+    object has closed, or as soon as the output cannot be a JSON object,
+    so the caller can cancel the rest of the generation. Each character is
+    scanned once.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.complete = False
+        self.invalid = False
+        self._scanned = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._end = None
+
+    def feed(self, chunk: str) -> bool:
+        if self.complete or self.invalid:
+            return True
+        self.text += chunk
+        text = self.text
+        for index in range(self._scanned, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                elif not char.isspace():
+                    self.invalid = True
+                    return True
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.complete = True
+                    self._end = index + 1
+                    return True
+        self._scanned = len(text)
+        return False
+
+    @property
+    def value(self) -> str:
+        """The complete object text, without anything generated after it."""
+        return self.text[:self._end] if self.complete else self.text
+
+# A score either opens the answer ("85", "**85**/100") or follows a "Score:" label
+_LEADING_SCORE = re.compile(r"\s*[*\"']*\s*(\d+(?:\.\d+)?)")
+_LABELED_SCORE = re.compile(r"\bscore[*\"']*\s*[:=]\s*[*\"']*\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+_PENDING = object()
+
+class ScoreParser:
+    """
+    Reads the score from a streamed answer.
+
+    Only a number that opens the answer, or one after a "Score:" label, is
+    taken as the score; numbers inside prose ("on a scale of 0 to 100") and
+    list markers ("1. The candidate ...") are not. `feed` returns True once
+    the score is known, e.g. when "85" is followed by "\\n" or "/100", so
+    the rest of the stream can be cancelled. `finish` settles a number that
+    ran to the end of the stream and returns None if there was no score.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.score: Optional[float] = None
+
+    def _read(self, final: bool):
+        match = _LEADING_SCORE.match(self.text)
+        if match:
+            number, rest = float(match.group(1)), self.text[match.end():]
+            if not rest or (rest[0] == "." and not rest[1:].strip()):
+                # "85" or "85." may still continue as "85.5" or as a list item
+                return number if final else _PENDING
+            list_marker = rest[0] == ")" or (rest[0] == "." and rest[1].isspace())
+            if not list_marker:
+                return number
+        match = _LABELED_SCORE.search(self.text)
+        if match:
+            rest = self.text[match.end():]
+            if rest in ("", "."):
+                return float(match.group(1)) if final else _PENDING
+            return float(match.group(1))
+        return None if final else _PENDING
+
+    def feed(self, chunk: str) -> bool:
+        if self.score is not None:
+            return True
+        self.text += chunk
+        score = self._read(final=False)
+        if score is _PENDING:
+            return False
+        self.score = score
+        return True
+
+    def finish(self) -> Optional[float]:
+        if self.score is None:
+            self.score = self._read(final=True)
+        return self.score
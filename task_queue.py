@@ -0,0 +1,223 @@
+from typing import Callable, Dict, Optional
+from datetime import datetime, timedelta
+import json
+import os
+import threading
+import time
+from sqlalchemy import func
+from database.models import JobDescription, JobTask
+
+JD_TASK_WORKERS = int(os.getenv('JD_TASK_WORKERS', 2))
+JD_TASK_MAX_ATTEMPTS = int(os.getenv('JD_TASK_MAX_ATTEMPTS', 2))
+# Wait before the first retry; doubles with each further failed attempt
+JD_TASK_RETRY_DELAY_SECONDS = float(os.getenv('JD_TASK_RETRY_DELAY_SECONDS', 5))
+
+class TaskQueue:
+    """
+    Durable task table in the application database.
+
+    Tasks are `JobTask` rows that move from "queued" to "running" to "done"
+    or "failed". `enqueue` adds the row to the caller's session, so it
+    commits in the same transaction as the job it belongs to; call `notify`
+    after the commit to wake a worker. A failed attempt goes back to
+    "queued", not before `retry_delay * 2 ** (attempts - 1)` seconds, until
+    `max_attempts` is reached. Tasks left "running" by a crashed process are
+    re-queued by `recover()` at startup.
+    """
+
+    def __init__(self, session_factory: Callable, max_attempts: int = JD_TASK_MAX_ATTEMPTS,
+                 retry_delay: float = JD_TASK_RETRY_DELAY_SECONDS):
+        self.session_factory = session_factory
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._available = threading.Condition()
+
+    @staticmethod
+    def _row_to_dict(task: Optional[JobTask]) -> Optional[Dict]:
+        if task is None:
+            return None
+        return {
+            "id": task.id, "kind": task.kind, "job_id": task.job_id, "payload": json.loads(task.payload),
+            "status": task.status, "attempts": task.attempts, "error": task.error, "note": task.note,
+            "created_at": task.created_at, "updated_at": task.updated_at
+        }
+
+    def enqueue(self, db, kind: str, job: JobDescription, payload: Dict) -> JobTask:
+        """Add a queued task for `job` to the session `db` without committing; returns the task row."""
+        task = JobTask(kind=kind, job=job, payload=json.dumps(payload), status="queued", attempts=0)
+        db.add(task)
+        return task
+
+    def notify(self):
+        """Wake a worker after a transaction that enqueued a task has committed."""
+        with self._available:
+            self._available.notify()
+
+    def claim(self, timeout: float) -> Optional[Dict]:
+        """Mark the oldest queued task that is due running and return it, waiting up to `timeout` seconds for one."""
+        deadline = time.monotonic() + timeout
+        while True:
+            db = self.session_factory()
+            try:
+                now = datetime.utcnow()
+                for task_id, in db.query(JobTask.id).filter(
+                    JobTask.status == "queued", JobTask.run_after <= now
+                ).order_by(JobTask.id).limit(8).all():
+                    # Only the worker whose update matches the queued row gets the task
+                    claimed = db.query(JobTask).filter(JobTask.id == task_id, JobTask.status == "queued").update(
+                        {JobTask.status: "running", JobTask.attempts: JobTask.attempts + 1, JobTask.updated_at: now},
+                        synchronize_session=False
+                    )
+                    db.commit()
+                    if claimed:
+                        return self._row_to_dict(db.query(JobTask).filter(JobTask.id == task_id).first())
+            finally:
+                db.close()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            with self._available:
+                self._available.wait(remaining)
+
+    def complete(self, task_id: int, note: Optional[str] = None):
+        """Mark a task done, keeping `note` for its status."""
+        db = self.session_factory()
+        try:
+            db.query(JobTask).filter(JobTask.id == task_id).update(
+                {JobTask.status: "done", JobTask.error: None, JobTask.note: note, JobTask.updated_at: datetime.utcnow()},
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def fail(self, task_id: int, error: str):
+        """Record a failed attempt, re-queueing the task after a backoff if it has attempts left."""
+        db = self.session_factory()
+        try:
+            task = db.query(JobTask).filter(JobTask.id == task_id).first()
+            if task is None:
+                return
+            now = datetime.utcnow()
+            task.error = error
+            task.updated_at = now
+            if task.attempts < self.max_attempts:
+                task.status = "queued"
+                task.run_after = now + timedelta(seconds=self.retry_delay * 2 ** max(task.attempts - 1, 0))
+            else:
+                task.status = "failed"
+            db.commit()
+        finally:
+            db.close()
+
+    def recover(self) -> int:
+        """Re-queue tasks that were running when the process stopped; returns how many."""
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            recovered = db.query(JobTask).filter(JobTask.status == "running").update(
+                {JobTask.status: "queued", JobTask.run_after: now, JobTask.updated_at: now},
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+        self.wake_all()
+        return recovered
+
+    def mark_legacy_jobs(self) -> int:
+        """
+        Gives every job description without a task an explicit one.
+
+        Jobs with no task were summarized synchronously, before tasks
+        existed, and get a task with status "legacy".
+
+        Returns:
+            int: The number of legacy tasks added
+        """
+        db = self.session_factory()
+        try:
+            untracked = {job_id for job_id, in db.query(JobDescription.id).filter(
+                ~JobDescription.id.in_(db.query(JobTask.job_id))
+            )}
+            for job_id in untracked:
+                db.add(JobTask(kind="summarize_jd", job_id=job_id, payload="{}", status="legacy", attempts=0))
+            db.commit()
+            return len(untracked)
+        finally:
+            db.close()
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        db = self.session_factory()
+        try:
+            return self._row_to_dict(db.query(JobTask).filter(JobTask.id == task_id).first())
+        finally:
+            db.close()
+
+    def latest_for_job(self, job_id: int, db=None) -> Optional[Dict]:
+        """Return the most recent task for a job, reading through `db` if given."""
+        session = db or self.session_factory()
+        try:
+            return self._row_to_dict(
+                session.query(JobTask).filter(JobTask.job_id == job_id).order_by(JobTask.id.desc()).first()
+            )
+        finally:
+            if db is None:
+                session.close()
+
+    def counts(self) -> Dict:
+        db = self.session_factory()
+        try:
+            return dict(db.query(JobTask.status, func.count(JobTask.id)).group_by(JobTask.status).all())
+        finally:
+            db.close()
+
+    def wake_all(self):
+        with self._available:
+            self._available.notify_all()
+
+class TaskWorkerPool:
+    """
+    In-process worker threads that run queued tasks with `handler(task)`.
+
+    A handler that raises fails the attempt; the queue decides whether it is
+    retried. A string returned by the handler is kept as the task's note.
+    """
+
+    def __init__(self, queue: TaskQueue, handler: Callable[[Dict], Optional[str]], workers: int = JD_TASK_WORKERS):
+        self.queue = queue
+        self.handler = handler
+        self.workers = max(workers, 1)
+        self._threads = []
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        self.queue.recover()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"task-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self):
+        while not self._stop.is_set():
+            task = self.queue.claim(timeout=1.0)
+            if task is None:
+                continue
+            try:
+                note = self.handler(task)
+            except Exception as e:
+                print(f"Error processing task {task['id']}: {str(e)}")
+                self.queue.fail(task["id"], str(e))
+            else:
+                self.queue.complete(task["id"], note)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop claiming tasks; a task still running is re-queued at the next start."""
+        self._stop.set()
+        self.queue.wake_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
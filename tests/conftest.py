@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The repository root also holds modules named like the standard library
+# (email.py, typing.py), so it is appended rather than put first on the path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TESTS = os.path.dirname(os.path.abspath(__file__))
+for path in (ROOT, TESTS):
+    if path not in sys.path:
+        sys.path.append(path)
@@ -0,0 +1,64 @@
+from typing import List, Optional
+import asyncio
+import json
+import httpx
+
+class FakeOllama:
+    """
+    In-process stand-in for the Ollama HTTP API, served through `httpx.MockTransport`.
+
+    `POST /api/generate` answers with `answer`, either as one JSON body or,
+    when the request asks for a stream, as one NDJSON line per `chunk_size`
+    characters. `delay` seconds pass before the first byte and `status_code`
+    other than 200 makes every call fail. Requests are recorded in
+    `requests`; `aborted` counts streams the client closed before the end.
+    """
+
+    def __init__(self, answer: str = "85", delay: float = 0.0, status_code: int = 200, chunk_size: int = 2):
+        self.answer = answer
+        self.delay = delay
+        self.status_code = status_code
+        self.chunk_size = chunk_size
+        self.requests: List[dict] = []
+        self.aborted = 0
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/api/generate":
+            return httpx.Response(404, json={"error": "not found"})
+        payload = json.loads(request.content)
+        self.requests.append(payload)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.status_code != 200:
+            return httpx.Response(self.status_code, json={"error": "model failed"})
+        if payload.get("stream"):
+            return httpx.Response(200, content=self._stream(len(payload["prompt"].split())))
+        return httpx.Response(200, json={
+            "model": payload["model"],
+            "response": self.answer,
+            "done": True,
+            "prompt_eval_count": len(payload["prompt"].split()),
+            "eval_count": self.token_count()
+        })
+
+    def token_count(self, text: Optional[str] = None) -> int:
+        text = self.answer if text is None else text
+        return -(-len(text) // self.chunk_size)
+
+    async def _stream(self, prompt_tokens: int):
+        finished = False
+        try:
+            for start in range(0, len(self.answer), self.chunk_size):
+                piece = self.answer[start:start + self.chunk_size]
+                yield (json.dumps({"response": piece, "done": False}) + "\n").encode()
+                await asyncio.sleep(0)
+            yield (json.dumps({
+                "response": "", "done": True, "prompt_eval_count": prompt_tokens, "eval_count": self.token_count()
+            }) + "\n").encode()
+            finished = True
+        finally:
+            if not finished:
+                self.aborted += 1
@@ -0,0 +1,92 @@
+import importlib
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import file_storage
+from file_storage import InMemoryFileStorage, release_files_with_rows, set_storage
+
+DIGEST = "ab" * 32
+
+@pytest.fixture
+def storage(monkeypatch):
+    monkeypatch.setattr(file_storage, "_storage", None)
+    storage = InMemoryFileStorage()
+    set_storage(storage)
+    yield storage
+    storage.close()
+
+@pytest.fixture
+def models(tmp_path, monkeypatch):
+    # models.py creates its default database in the working directory on import
+    monkeypatch.chdir(tmp_path)
+    models = importlib.import_module("models")
+    release_files_with_rows(models.Resume, models.JobDescription)
+    return models
+
+@pytest.fixture
+def session(models):
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+def test_same_bytes_are_stored_once_with_a_reference_each(storage):
+    first = storage.put_bytes(b"resume", DIGEST, ".PDF")
+    second = storage.put_bytes(b"resume", DIGEST, ".pdf")
+    assert first == second == f"ab/ab/{DIGEST}.pdf"
+    assert storage.refcount(first) == 2
+    assert storage.read(first) == b"resume"
+
+def test_file_is_deleted_with_its_last_reference(storage):
+    key = storage.put_bytes(b"resume", DIGEST, ".pdf")
+    storage.put_bytes(b"resume", DIGEST, ".pdf")
+    assert storage.release(key) == 1
+    assert storage.exists(key)
+    assert storage.release(key) == 0
+    assert not storage.exists(key)
+
+def test_deleting_rows_releases_their_shared_file(storage, models, session):
+    key = storage.put_bytes(b"resume", DIGEST, ".pdf")
+    storage.put_bytes(b"resume", DIGEST, ".pdf")
+    first, second = models.Resume(file_path=key), models.Resume(file_path=key)
+    session.add_all([first, second])
+    session.commit()
+
+    session.delete(first)
+    session.commit()
+    assert storage.exists(key)
+    assert storage.refcount(key) == 1
+
+    session.delete(second)
+    session.commit()
+    assert not storage.exists(key)
+
+def test_rolled_back_delete_keeps_the_file(storage, models, session):
+    key = storage.put_bytes(b"job", DIGEST, ".txt")
+    job = models.JobDescription(file_path=key)
+    session.add(job)
+    session.commit()
+
+    session.delete(job)
+    session.flush()
+    session.rollback()
+    assert storage.refcount(key) == 1
+
+def test_replacing_a_file_releases_the_old_one(storage, models, session):
+    old_key = storage.put_bytes(b"old", DIGEST, ".pdf")
+    new_key = storage.put_bytes(b"new", "cd" * 32, ".pdf")
+    resume = models.Resume(file_path=old_key)
+    session.add(resume)
+    session.commit()
+
+    resume.file_path = new_key
+    session.commit()
+    assert not storage.exists(old_key)
+    assert storage.refcount(new_key) == 1
+
+def test_stored_file_path_materializes_the_file(storage):
+    key = storage.put_bytes(b"resume", DIGEST, ".pdf")
+    with open(file_storage.stored_file_path(key), "rb") as file:
+        assert file.read() == b"resume"
+    assert file_storage.stored_file_path("missing/key.pdf") is None
@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+import pytest
+from fake_ollama import FakeOllama
+from llm_gateway import CircuitBreaker, LLMGateway
+from stream_parsers import ScoreParser
+
+def make_gateway(server: FakeOllama, **kwargs) -> LLMGateway:
+    return LLMGateway(base_url="http://ollama.test", transport=server.transport(), **kwargs)
+
+def wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.01)
+
+@pytest.fixture
+def server():
+    return FakeOllama(answer="85")
+
+def test_generate_returns_answer_and_token_counts(server):
+    gateway = make_gateway(server)
+    try:
+        result = gateway.generate("rate this candidate")
+    finally:
+        gateway.close()
+    assert not result.fallback
+    assert result.text == "85"
+    assert result.prompt_tokens == 3
+    assert result.completion_tokens == server.token_count()
+    assert server.requests[0]["stream"] is False
+
+def test_stopped_stream_counts_streamed_chunks():
+    server = FakeOllama(answer="85\nThe candidate meets most requirements.")
+    gateway = make_gateway(server)
+    parser = ScoreParser()
+    try:
+        result = gateway.generate("rate this candidate", stop_when=parser.feed)
+    finally:
+        gateway.close()
+    assert result.stopped_early
+    assert parser.finish() == 85
+    assert result.text.startswith("85")
+    assert result.completion_tokens == server.token_count(result.text)
+    assert result.prompt_tokens is None
+
+@pytest.mark.parametrize("answer", ["On a scale of 0 to 100, I rate 85", "1. The candidate has Python"])
+def test_score_only_read_at_start_or_after_label(answer):
+    parser = ScoreParser()
+    for start in range(0, len(answer), 2):
+        parser.feed(answer[start:start + 2])
+    assert parser.finish() is None
+
+def test_deadline_returns_fallback_and_counts_as_failure():
+    server = FakeOllama(delay=1.0)
+    gateway = make_gateway(server, breaker=CircuitBreaker(failure_threshold=5))
+    try:
+        started = time.monotonic()
+        result = gateway.generate("slow prompt", deadline=0.1, fallback="50")
+        elapsed = time.monotonic() - started
+    finally:
+        gateway.close()
+    assert result.fallback
+    assert result.text == "50"
+    assert result.error == "deadline exceeded"
+    assert elapsed < 0.9
+    assert gateway.breaker.failures == 1
+
+def test_full_queue_rejects_without_calling_server():
+    server = FakeOllama(delay=0.5)
+    gateway = make_gateway(server, max_concurrency=1, max_queue=1)
+    try:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            running = pool.submit(gateway.generate, "first")
+            wait_for(lambda: gateway.in_flight == 1)
+            waiting = pool.submit(gateway.generate, "second")
+            wait_for(lambda: gateway.queued == 1)
+
+            rejected = gateway.generate("third")
+            assert rejected.fallback
+            assert rejected.error == "queue full"
+
+            assert not running.result().fallback
+            assert not waiting.result().fallback
+    finally:
+        gateway.close()
+    assert [request["prompt"] for request in server.requests] == ["first", "second"]
+
+def test_circuit_opens_then_half_opens_and_closes_on_success():
+    server = FakeOllama(status_code=500)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    gateway = make_gateway(server, breaker=breaker)
+    try:
+        assert gateway.generate("a").fallback
+        assert breaker.state == "closed"
+        assert gateway.generate("b").fallback
+        assert breaker.state == "open"
+
+        # Open: calls fail fast without reaching the server
+        result = gateway.generate("c")
+        assert result.error == "circuit open"
+        assert len(server.requests) == 2
+
+        time.sleep(0.25)
+        assert breaker.state == "half-open"
+        server.status_code = 200
+        result = gateway.generate("probe")
+        assert not result.fallback
+        assert breaker.state == "closed"
+        assert len(server.requests) == 3
+    finally:
+        gateway.close()
+
+def test_failed_probe_reopens_circuit():
+    server = FakeOllama(status_code=503)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+    gateway = make_gateway(server, breaker=breaker)
+    try:
+        assert gateway.generate("a").fallback
+        assert breaker.state == "open"
+        time.sleep(0.25)
+        assert breaker.state == "half-open"
+        assert gateway.generate("probe").fallback
+        assert breaker.state == "open"
+        assert gateway.generate("b").error == "circuit open"
+    finally:
+        gateway.close()
@@ -0,0 +1,89 @@
+import os
+import time
+import pytest
+import resume_parser
+from parser_workers import ParserPool
+
+# Forked workers inherit the patched parser functions below
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork to patch worker code")
+
+def fake_derive(text: str):
+    if text == "hang":
+        time.sleep(30)
+    if text == "crash":
+        os._exit(1)
+    if text == "bloat":
+        bytearray(4 * 1024 ** 3)
+    return {"pid": os.getpid(), "text": text}
+
+def address_space_mb() -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmSize:"):
+                return int(line.split()[1]) // 1024
+    pytest.skip("no /proc/self/status")
+
+@pytest.fixture(autouse=True)
+def patched_parser(monkeypatch):
+    monkeypatch.setattr(resume_parser, "derive_resume_fields", fake_derive)
+
+def make_pool(**kwargs) -> ParserPool:
+    kwargs.setdefault("workers", 1)
+    return ParserPool(start_method="fork", **kwargs)
+
+def test_workers_are_recycled_after_max_tasks():
+    pool = make_pool(max_tasks_per_worker=2)
+    try:
+        outcomes = pool.derive_many([f"resume {number}" for number in range(5)])
+    finally:
+        pool.close()
+    assert [outcome["status"] for outcome in outcomes] == ["ok"] * 5
+    pids = [outcome["data"]["pid"] for outcome in outcomes]
+    assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+
+def test_hanging_file_times_out_without_failing_the_rest():
+    pool = make_pool(workers=2, timeout=0.5)
+    try:
+        started = time.monotonic()
+        outcomes = pool.derive_many(["a", "hang", "b", "c"])
+        elapsed = time.monotonic() - started
+        again = pool.derive_many(["d"])
+    finally:
+        pool.close()
+    assert [outcome["status"] for outcome in outcomes] == ["ok", "timeout", "ok", "ok"]
+    assert elapsed < 5
+    assert again[0]["status"] == "ok"
+
+def test_crashed_worker_is_replaced():
+    pool = make_pool()
+    try:
+        outcomes = pool.derive_many(["crash", "after"])
+    finally:
+        pool.close()
+    assert outcomes[0]["status"] == "failed"
+    assert "worker crashed" in outcomes[0]["error"]
+    assert outcomes[1]["status"] == "ok"
+
+def test_memory_limit_fails_only_the_bloated_file():
+    pool = make_pool(memory_limit_mb=address_space_mb() + 256)
+    try:
+        outcomes = pool.derive_many(["bloat", "fine"])
+    finally:
+        pool.close()
+    assert outcomes[0] == {"status": "failed", "data": None, "text": None, "error": "memory limit exceeded"}
+    assert outcomes[1]["status"] == "ok"
+
+def test_broken_pipe_recycles_worker_and_retries_task():
+    pool = make_pool()
+    try:
+        pool.derive_many(["warm up"])
+        worker = pool._workers[0]
+        old_pid = worker.process.pid
+        worker.conn.close()
+        outcomes = pool.derive_many(["retried"])
+        idle = pool._idle.qsize()
+    finally:
+        pool.close()
+    assert outcomes[0]["status"] == "ok"
+    assert outcomes[0]["data"]["pid"] != old_pid
+    assert idle == 1
@@ -0,0 +1,91 @@
+import re
+import pytest
+import llm_cache
+import llm_gateway
+import matcher
+from benchmarks.stub_llm import StubGateway
+from llm_cache import LLMScoreCache
+from llm_gateway import LLMResult
+from matcher import analyze_qualifications_batch
+from pipeline_metrics import MatchTrace
+
+JD = "Backend engineer: Python, PostgreSQL, 5+ years"
+
+class BatchGateway(StubGateway):
+    """StubGateway whose batched calls fail with `error` above `max_answered` candidates, or answer `text`."""
+
+    def __init__(self, max_answered: int = 8, error: str = "timeout", text: str = None):
+        super().__init__()
+        self.max_answered = max_answered
+        self.error = error
+        self.text = text
+        self.batch_sizes = []
+
+    def generate(self, prompt, model="llama2", format=None, deadline=None, fallback="", options=None, stop_when=None):
+        size = len(re.findall(r"^\s*Candidate \d+:$", prompt, re.MULTILINE))
+        if size:
+            self.batch_sizes.append(size)
+            if size > self.max_answered:
+                self.calls += 1
+                return LLMResult(text=fallback, model=model, fallback=True, error=self.error)
+            if self.text is not None:
+                self.calls += 1
+                if stop_when is not None:
+                    stop_when(self.text)
+                return LLMResult(text=self.text, model=model)
+        return super().generate(prompt, model, format, deadline, fallback, options, stop_when)
+
+@pytest.fixture(autouse=True)
+def score_cache(tmp_path, monkeypatch):
+    cache = LLMScoreCache(path=str(tmp_path / "llm_cache.db"))
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    monkeypatch.setattr(matcher, "QUALIFICATION_MAX_BATCH", 8)
+    return cache
+
+def install(monkeypatch, gateway: StubGateway) -> StubGateway:
+    monkeypatch.setattr(llm_gateway, "_gateway", gateway)
+    return gateway
+
+def profiles(count: int) -> list:
+    return [f"Skills: python, skill{number}\nExperience: {number} years" for number in range(count)]
+
+def test_timed_out_batches_are_halved_until_answered(monkeypatch):
+    gateway = install(monkeypatch, BatchGateway(max_answered=2))
+    trace = MatchTrace()
+    scores = analyze_qualifications_batch(JD, profiles(8), trace)
+    assert gateway.batch_sizes == [8, 4, 2, 2, 2, 2]
+    assert trace.details["llm_batch_calls"] == 6
+    assert trace.details["llm_single_calls"] == 0
+    assert trace.details["qualification_fallback"] == "timeout"
+    assert all(0 <= score <= 100 for score in scores)
+    assert 50.0 not in scores
+
+def test_unparseable_batches_fall_back_to_single_calls(monkeypatch):
+    gateway = install(monkeypatch, BatchGateway(text="not json"))
+    trace = MatchTrace()
+    scores = analyze_qualifications_batch(JD, profiles(4), trace)
+    assert gateway.batch_sizes == [4, 2]
+    assert trace.details["llm_single_calls"] == 4
+    assert len(scores) == 4
+
+def test_missing_rows_are_rescored_one_at_a_time(monkeypatch):
+    gateway = install(monkeypatch, BatchGateway(text='{"scores": [{"id": 1, "score": 90}, {"id": 3, "score": "70"}]}'))
+    trace = MatchTrace()
+    scores = analyze_qualifications_batch(JD, profiles(3), trace)
+    assert gateway.batch_sizes == [3]
+    assert (scores[0], scores[2]) == (90.0, 70.0)
+    assert trace.details["llm_single_calls"] == 1
+
+def test_open_circuit_scores_the_batch_neutrally_without_retrying(monkeypatch):
+    gateway = install(monkeypatch, BatchGateway(max_answered=0, error="circuit open"))
+    assert analyze_qualifications_batch(JD, profiles(5)) == [50.0] * 5
+    assert gateway.batch_sizes == [5]
+
+def test_answered_scores_are_cached(monkeypatch):
+    install(monkeypatch, BatchGateway(max_answered=2))
+    first = analyze_qualifications_batch(JD, profiles(4))
+    gateway = install(monkeypatch, BatchGateway())
+    trace = MatchTrace()
+    assert analyze_qualifications_batch(JD, profiles(4), trace) == first
+    assert gateway.calls == 0
+    assert trace.details["qualification_cache_hits"] == 4
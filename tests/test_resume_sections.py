@@ -0,0 +1,49 @@
+from resume_parser import derive_resume_fields
+from resume_sections import Section, section_text, segment_sections
+
+RESUME = """Jane Doe
+jane@example.com
+
+PROFESSIONAL SUMMARY:
+Backend engineer.
+
+Work Experience
+Acme Corp - Senior Engineer
+Built the billing service.
+
+Education & Training
+BSc Computer Science
+
+- Skills -
+Python, Docker
+"""
+
+def test_headers_split_the_text_into_sections():
+    sections = segment_sections(RESUME)
+    assert [section.name for section in sections] == ["summary", "experience", "education", "skills"]
+    assert section_text(RESUME, sections, "experience") == "Acme Corp - Senior Engineer\nBuilt the billing service."
+    assert section_text(RESUME, sections, "education") == "BSc Computer Science"
+    assert section_text(RESUME, sections, "skills") == "Python, Docker"
+
+def test_text_before_the_first_header_is_not_a_section():
+    sections = segment_sections(RESUME)
+    assert sections[0].start == RESUME.index("Backend engineer.")
+    assert "Jane Doe" not in section_text(RESUME, sections, "summary")
+
+def test_long_lines_and_mentions_are_not_headers():
+    text = "Summary\nI have experience with Python.\nSkills and experience gained across many long projects\n"
+    assert [section.name for section in segment_sections(text)] == ["summary"]
+
+def test_repeated_sections_are_joined():
+    text = "Experience\nFirst job\nSkills\nGo\nExperience\nSecond job"
+    sections = segment_sections(text)
+    assert section_text(text, sections, "experience") == "First job\n\nSecond job"
+    assert section_text(text, sections, "projects") == ""
+
+def test_header_on_the_last_line_has_an_empty_body():
+    text = "Summary\nHello\nSkills"
+    assert segment_sections(text)[-1] == Section("skills", len(text), len(text))
+
+def test_experience_falls_back_to_the_full_text_without_headers():
+    text = "Jane Doe\nBuilt the billing service at Acme."
+    assert derive_resume_fields(text)["experience"] == text
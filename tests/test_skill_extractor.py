@@ -0,0 +1,43 @@
+import pytest
+from resume_parser import derive_resume_fields, extract_skills
+from skill_extractor import get_skill_extractor
+from skill_taxonomy import get_taxonomy
+
+PROSE = (
+    "I spent the rest of spring 2020 working as a swift chef, learning to express ideas, "
+    "sketch menus and keep the Node café running. HR praised my sales numbers."
+)
+
+def skills(text: str, trusted_spans=()) -> list:
+    taxonomy = get_taxonomy()
+    return [taxonomy.name(skill_id) for skill_id in get_skill_extractor().extract(text, trusted_spans)]
+
+@pytest.mark.parametrize("name", ["rest", "spring", "swift", "chef", "express", "sketch", "node", "hr", "shell", "ui"])
+def test_common_words_are_marked_ambiguous(name):
+    assert name in get_taxonomy().ambiguous()
+
+def test_ambiguous_words_in_prose_are_not_skills():
+    assert skills(PROSE) == []
+
+def test_ambiguous_words_next_to_other_words_are_not_skills():
+    assert skills("Worked in HR and sales for a Python shop before a swift move to Go Ventures") == ["python"]
+
+def test_ambiguous_words_listed_with_skills_are_kept():
+    assert skills("Built services with Java, Spring and REST; deployed via Docker/Chef") == [
+        "java", "spring", "rest api", "docker", "chef"
+    ]
+
+def test_ambiguous_words_in_trusted_span_are_kept():
+    text = "Swift Express"
+    assert skills(text) == []
+    assert skills(text, [(0, len(text))]) == ["swift", "express"]
+
+def test_longest_match_wins_before_ambiguity_is_checked():
+    assert skills("Designed a REST API in Spring Boot") == ["rest api", "spring boot"]
+
+def test_resume_skills_section_trusts_ambiguous_names():
+    text = "Jane Doe\njane@example.com\n\nSummary\n" + PROSE + "\n\nSkills\nSwift\nSketch\nUI\n"
+    assert derive_resume_fields(text)["skills"] == ["swift", "sketch", "ui design"]
+
+def test_extract_skills_without_sections_ignores_prose():
+    assert extract_skills(PROSE) == []
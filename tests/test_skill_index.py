@@ -0,0 +1,50 @@
+from skill_index import SkillIndex
+
+def make_index() -> SkillIndex:
+    index = SkillIndex()
+    index.add(1, ["Python", "Docker", "AWS"])
+    index.add(2, ["python3", "Docker"])
+    index.add(3, ["Java"])
+    return index
+
+def test_candidates_are_ranked_by_shared_skills():
+    index = make_index()
+    assert index.candidates_for(["Python", "Docker", "Amazon Web Services"]) == (2, [(1, 3), (2, 2)])
+    assert index.candidates_for(["py", "docker"], min_shared=2) == (2, [(1, 2), (2, 2)])
+    assert index.candidates_for(["Python", "Java"], limit=1) == (3, [(1, 1)])
+    assert index.candidates_for(["rust"]) == (0, [])
+    assert len(index) == 3
+
+def test_replaced_skills_are_tombstoned():
+    index = make_index()
+    index.replace(1, ["Python", "Docker", "AWS"], ["Python", "Kubernetes"])
+    assert index.candidates_for(["Docker"]) == (1, [(2, 1)])
+    assert index.candidates_for(["Kubernetes", "Python"]) == (2, [(1, 2), (2, 1)])
+    assert index.candidates_for(["AWS"]) == (0, [])
+
+def test_restoring_a_removed_skill_drops_its_tombstone():
+    index = SkillIndex()
+    for candidate_id in range(1, 6):
+        index.add(candidate_id, ["Python"])
+    index.replace(1, ["Python"], ["Java"])
+    index.replace(1, ["Java"], ["Python"])
+    total, page = index.candidates_for(["Python"])
+    assert total == 5
+    assert sorted(candidate_id for candidate_id, _ in page) == [1, 2, 3, 4, 5]
+
+def test_posting_list_is_compacted_once_half_is_tombstones():
+    index = SkillIndex()
+    for candidate_id in range(1, 5):
+        index.add(candidate_id, ["Python"])
+    index.replace(1, ["Python"], [])
+    assert len(index._postings["python"]) == 4
+    index.replace(2, ["Python"], [])
+    assert list(index._postings["python"]) == [3, 4]
+    assert "python" not in index._removed
+    assert index.candidates_for(["Python"]) == (2, [(3, 1), (4, 1)])
+
+def test_load_rebuilds_postings():
+    index = SkillIndex()
+    index.load([("python", 1), ("docker", 1), ("python", 2)])
+    assert len(index) == 2
+    assert index.candidates_for(["Python", "Docker"]) == (2, [(1, 2), (2, 1)])
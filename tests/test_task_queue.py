@@ -0,0 +1,101 @@
+from datetime import timedelta
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+models = pytest.importorskip("database.models")
+from task_queue import TaskQueue, TaskWorkerPool
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+def add_job(session_factory, queue: TaskQueue = None) -> int:
+    db = session_factory()
+    try:
+        job = models.JobDescription(title="Untitled")
+        db.add(job)
+        if queue is not None:
+            queue.enqueue(db, "summarize_jd", job, {"storage_key": "ab/cd/abcd.txt"})
+        db.commit()
+        return job.id
+    finally:
+        db.close()
+
+def test_claim_marks_the_oldest_task_running(session_factory):
+    queue = TaskQueue(session_factory)
+    first, second = add_job(session_factory, queue), add_job(session_factory, queue)
+    task = queue.claim(timeout=0)
+    assert (task["job_id"], task["status"], task["attempts"]) == (first, "running", 1)
+    assert task["payload"] == {"storage_key": "ab/cd/abcd.txt"}
+    assert queue.claim(timeout=0)["job_id"] == second
+    assert queue.claim(timeout=0) is None
+
+def test_failed_attempts_back_off_then_fail(session_factory):
+    queue = TaskQueue(session_factory, max_attempts=3, retry_delay=5)
+    add_job(session_factory, queue)
+    delays = []
+    for attempt in range(2):
+        task = queue.claim(timeout=0)
+        queue.fail(task["id"], f"attempt {attempt + 1} failed")
+        db = session_factory()
+        row = db.query(models.JobTask).first()
+        assert row.status == "queued"
+        delays.append(row.run_after - row.updated_at)
+        # Not due yet, so it cannot be claimed; make it due to continue
+        assert queue.claim(timeout=0) is None
+        row.run_after = row.updated_at
+        db.commit()
+        db.close()
+    assert delays == [timedelta(seconds=5), timedelta(seconds=10)]
+
+    task = queue.claim(timeout=0)
+    queue.fail(task["id"], "attempt 3 failed")
+    assert queue.get(task["id"])["status"] == "failed"
+    assert queue.get(task["id"])["error"] == "attempt 3 failed"
+    assert queue.counts() == {"failed": 1}
+
+def test_recover_requeues_running_tasks(session_factory):
+    queue = TaskQueue(session_factory)
+    add_job(session_factory, queue)
+    task = queue.claim(timeout=0)
+    assert queue.recover() == 1
+    again = queue.claim(timeout=0)
+    assert (again["id"], again["attempts"]) == (task["id"], 2)
+
+def test_workers_retry_failed_tasks_and_keep_the_note(session_factory):
+    queue = TaskQueue(session_factory, retry_delay=0)
+    job_id = add_job(session_factory, queue)
+    calls = []
+
+    def handler(task):
+        calls.append(task["attempts"])
+        if len(calls) == 1:
+            raise RuntimeError("LLM unavailable")
+        return "summarized the first part only"
+
+    workers = TaskWorkerPool(queue, handler, workers=1)
+    workers.start()
+    queue.notify()
+    try:
+        deadline = time.monotonic() + 5
+        while queue.latest_for_job(job_id)["status"] != "done":
+            assert time.monotonic() < deadline, "task not done"
+            time.sleep(0.02)
+    finally:
+        workers.stop()
+    task = queue.latest_for_job(job_id)
+    assert calls == [1, 2]
+    assert (task["attempts"], task["error"], task["note"]) == (2, None, "summarized the first part only")
+
+def test_jobs_without_tasks_are_marked_legacy(session_factory):
+    queue = TaskQueue(session_factory)
+    legacy = add_job(session_factory)
+    add_job(session_factory, queue)
+    assert queue.mark_legacy_jobs() == 1
+    assert queue.latest_for_job(legacy)["status"] == "legacy"
+    assert queue.mark_legacy_jobs() == 0
@@ -0,0 +1,48 @@
+import hashlib
+import pytest
+import text_store
+from resume_parser import TEXT_EXTRACTION_VERSION
+from text_store import TextRecord, TextStore
+
+def digest(data: str) -> str:
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+@pytest.fixture
+def store(tmp_path):
+    return TextStore(str(tmp_path / "text_store"))
+
+def test_text_round_trips_with_its_version(store):
+    text = "Jane Doe\nPython, Docker – café ✓\n" * 50
+    store.put(digest("a"), text, TEXT_EXTRACTION_VERSION)
+    assert store.get(digest("a")) == TextRecord(text, TEXT_EXTRACTION_VERSION)
+    assert digest("a") in store
+
+def test_missing_digest_returns_none(store):
+    assert store.get(digest("missing")) is None
+    assert digest("missing") not in store
+
+def test_record_from_an_older_extraction_is_detectable_and_superseded(store):
+    store.put(digest("a"), "old text", TEXT_EXTRACTION_VERSION - 1)
+    assert store.get(digest("a")).text_version < TEXT_EXTRACTION_VERSION
+
+    store.put(digest("a"), "new text", TEXT_EXTRACTION_VERSION)
+    assert store.get(digest("a")) == TextRecord("new text", TEXT_EXTRACTION_VERSION)
+    assert store.stats()["entries"] == 1
+
+def test_records_appended_by_another_store_are_visible(store, tmp_path):
+    other = TextStore(str(tmp_path / "text_store"))
+    assert store.get(digest("a")) is None
+    other.put(digest("a"), "written elsewhere", TEXT_EXTRACTION_VERSION)
+    assert store.get(digest("a")).text == "written elsewhere"
+
+def test_text_is_compressed(store):
+    store.put(digest("a"), "experience " * 1000, TEXT_EXTRACTION_VERSION)
+    stats = store.stats()
+    assert stats["text_bytes"] == len("experience " * 1000)
+    assert stats["stored_bytes"] < stats["text_bytes"] // 10
+
+def test_zlib_records_read_back_without_zstandard(store, monkeypatch):
+    monkeypatch.setattr(text_store, "zstandard", None)
+    store.put(digest("a"), "plain zlib", TEXT_EXTRACTION_VERSION)
+    assert store.get(digest("a")).text == "plain zlib"
+    assert store.stats()["codec"] == "zlib"
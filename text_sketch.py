@@ -0,0 +1,58 @@
+from functools import lru_cache
+import zlib
+import numpy as np
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+
+# Universal hashing modulo a Mersenne prime keeps every product inside uint64
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, _PRIME, size=(NUM_PERMUTATIONS, 1), dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, size=(NUM_PERMUTATIONS, 1), dtype=np.uint64)
+_CHUNK = 4096
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Return the set of character shingles of whitespace-normalized, lowercased text."""
+    normalized = " ".join(text.lower().split())
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+def minhash_signature(text: str) -> bytes:
+    """
+    Computes a fixed-size MinHash signature of a text.
+
+    Args:
+        text (str): Text to sketch
+
+    Returns:
+        bytes: NUM_PERMUTATIONS little-endian uint32 minimums
+    """
+    signature = np.full(NUM_PERMUTATIONS, _PRIME, dtype=np.uint64)
+    items = shingles(text)
+    hashes = np.fromiter(
+        (zlib.crc32(item.encode('utf-8')) for item in items),
+        dtype=np.uint64,
+        count=len(items)
+    ) % _PRIME
+
+    # Hash in chunks so long documents don't allocate a huge permutation matrix
+    for start in range(0, len(hashes), _CHUNK):
+        permuted = (_A * hashes[start:start + _CHUNK] + _B) % _PRIME
+        np.minimum(signature, permuted.min(axis=1), out=signature)
+
+    return signature.astype('<u4').tobytes()
+
+@lru_cache(maxsize=1024)
+def cached_minhash_signature(text: str) -> bytes:
+    """MinHash signature for short, frequently repeated texts such as JD requirements."""
+    return minhash_signature(text)
+
+def signature_similarity(first: bytes, second: bytes) -> float:
+    """Estimate the Jaccard similarity (0 to 1) of two texts from their signatures."""
+    a = np.frombuffer(first, dtype='<u4')
+    b = np.frombuffer(second, dtype='<u4')
+    if a.size == 0 or a.size != b.size:
+        return 0.0
+    return float(np.count_nonzero(a == b)) / a.size
@@ -0,0 +1,149 @@
+from typing import Dict, NamedTuple, Optional
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # Records are zlib-compressed instead
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # No cross-process append lock on this platform
+
+TEXT_STORE_PATH = os.getenv('TEXT_STORE_PATH', 'text_store')
+
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# digest, blob offset, compressed length, text length, codec, text extraction version
+_INDEX_RECORD = struct.Struct("<32sQIIBH")
+
+class TextRecord(NamedTuple):
+    text: str
+    text_version: int
+
+def _compress(data: bytes):
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=3).compress(data)
+    return CODEC_ZLIB, zlib.compress(data, 6)
+
+def _decompress(codec: int, data: bytes) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Text record is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+class TextStore:
+    """
+    Append-only store of extracted resume text, keyed by file content hash.
+
+    Text is compressed into a single blob file. A fixed-size index record
+    per entry is appended to a separate file that readers memory-map, so a
+    lookup reads one index slot and one blob range. Each record carries the
+    resume_parser.TEXT_EXTRACTION_VERSION that produced it; storing a hash
+    again supersedes the older record.
+    """
+
+    def __init__(self, root: str = TEXT_STORE_PATH):
+        os.makedirs(root, exist_ok=True)
+        self._blob_path = os.path.join(root, "texts.blob")
+        self._index_path = os.path.join(root, "texts.idx")
+        for path in (self._blob_path, self._index_path):
+            open(path, "ab").close()
+        self._lock = threading.Lock()
+        self._index = None
+        self._mapped_size = 0
+        self._slots: Dict[bytes, int] = {}
+
+    def _refresh(self):
+        # Map new index records appended since the last look, possibly by another process
+        size = os.path.getsize(self._index_path)
+        size -= size % _INDEX_RECORD.size
+        if size == self._mapped_size:
+            return
+        if self._index is not None:
+            self._index.close()
+        with open(self._index_path, "rb") as file:
+            self._index = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
+        for offset in range(self._mapped_size, size, _INDEX_RECORD.size):
+            self._slots[self._index[offset:offset + 32]] = offset
+        self._mapped_size = size
+
+    def get(self, digest: str) -> Optional[TextRecord]:
+        """
+        Looks up the extracted text of a file.
+
+        Args:
+            digest (str): SHA-256 hex digest of the original file
+
+        Returns:
+            Optional[TextRecord]: The text and the text extraction version that produced it, or None
+        """
+        key = bytes.fromhex(digest)
+        with self._lock:
+            self._refresh()
+            slot = self._slots.get(key)
+            if slot is None:
+                return None
+            _, offset, length, _, codec, text_version = _INDEX_RECORD.unpack_from(self._index, slot)
+        with open(self._blob_path, "rb") as file:
+            file.seek(offset)
+            data = file.read(length)
+        return TextRecord(_decompress(codec, data).decode("utf-8"), text_version)
+
+    def put(self, digest: str, text: str, text_version: int):
+        """Store the extracted text of the file with SHA-256 hex `digest`."""
+        raw = text.encode("utf-8")
+        codec, data = _compress(raw)
+        with self._lock, open(self._blob_path, "ab") as blob, open(self._index_path, "ab") as index:
+            if fcntl is not None:
+                fcntl.flock(blob.fileno(), fcntl.LOCK_EX)
+            try:
+                offset = blob.seek(0, os.SEEK_END)
+                blob.write(data)
+                blob.flush()
+                # The index record goes last, so readers never see a slot without its blob
+                index.write(_INDEX_RECORD.pack(bytes.fromhex(digest), offset, len(data), len(raw), codec, text_version))
+                index.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(blob.fileno(), fcntl.LOCK_UN)
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return bytes.fromhex(digest) in self._slots
+
+    def stats(self) -> Dict:
+        """Return entry counts and stored vs. raw text sizes."""
+        with self._lock:
+            self._refresh()
+            stored = raw = 0
+            for slot in self._slots.values():
+                _, _, length, text_length, _, _ = _INDEX_RECORD.unpack_from(self._index, slot)
+                stored += length
+                raw += text_length
+        return {
+            "entries": len(self._slots),
+            "stored_bytes": stored,
+            "text_bytes": raw,
+            "blob_bytes": os.path.getsize(self._blob_path),
+            "codec": "zstd" if zstandard is not None else "zlib"
+        }
+
+_text_store = None
+_text_store_lock = threading.Lock()
+
+def get_text_store() -> TextStore:
+    """Return the shared extracted-text store."""
+    global _text_store
+    with _text_store_lock:
+        if _text_store is None:
+            _text_store = TextStore()
+        return _text_store